@@ -2,6 +2,8 @@
 Automated agent selection system
 """
 
+import importlib
+
 from .task_classifier import (
     TaskClassifier,
     TaskCategory,
@@ -11,17 +13,31 @@ from .task_classifier import (
     TaskFeatures
 )
 
-from .agent_capabilities import (
-    AgentCapability,
-    AgentCapabilityMatrix
-)
+# Capability and selector names are imported on first access (PEP 562),
+# so importing the package does not load the agent roster
+_LAZY_IMPORTS = {
+    'AgentCapability': '.agent_capabilities',
+    'AgentCapabilityMatrix': '.agent_capabilities',
+    'get_default_matrix': '.agent_capabilities',
+    'AgentSelector': '.agent_selector',
+    'SelectionStrategy': '.agent_selector',
+    'AgentScore': '.agent_selector',
+    'TeamComposition': '.agent_selector'
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
 
-from .agent_selector import (
-    AgentSelector,
-    SelectionStrategy,
-    AgentScore,
-    TeamComposition
-)
 
 __all__ = [
     # Task classification
@@ -35,10 +51,11 @@ __all__ = [
     # Agent capabilities
     'AgentCapability',
     'AgentCapabilityMatrix',
+    'get_default_matrix',
     
     # Agent selection
     'AgentSelector',
     'SelectionStrategy',
     'AgentScore',
     'TeamComposition'
-]
\ No newline at end of file
+]
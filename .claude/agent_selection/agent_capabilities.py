@@ -2,139 +2,307 @@
 Agent capability matrix for automated agent selection
 """
 
-from typing import Dict, List, Set, Optional, Any
-from dataclasses import dataclass, field
-from enum import Enum
-
 import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import threading
+from typing import Dict, Iterator, List, Set, Optional, Any, Tuple, Sequence
+from enum import Enum
+from functools import lru_cache
 
-from agent_selection.task_classifier import (
+from .task_classifier import (
     TaskCategory, TaskComplexity, ProgrammingLanguage, 
-    Framework, TaskFeatures
+    Framework, TaskFeatures,
+    REQ_TEST, REQ_REVIEW, REQ_DEPLOY, REQ_DEBUG, REQ_REFACTOR,
+    CATEGORY_BITS, LANGUAGE_BITS, FRAMEWORK_BITS, _bitmask
 )
 
+# Special requirement score indexed by the number of unmet requirements;
+# with five requirement bits it never drops below zero
+_SPECIAL_SCORES = [1.0]
+for _ in range(5):
+    _SPECIAL_SCORES.append(_SPECIAL_SCORES[-1] - 0.2)
+_SPECIAL_SCORES = tuple(_SPECIAL_SCORES)
 
-@dataclass
-class AgentCapability:
-    """Defines capabilities of a single agent"""
-    agent_id: str
-    agent_type: str
-    description: str
+# Collaboration groups: members of a group work well with each other
+_PYTHON_GROUP = frozenset({
+    'python-pro', 'data-analyst', 'data-scientist', 'data-engineer', 'ai-engineer'
+})
+_FRONTEND_GROUP = frozenset({
+    'frontend-developer', 'typescript-pro', 'nextjs-developer', 'ux-researcher'
+})
+
+
+class _AllAgents:
+    """
+    Collaborator list meaning every agent in a matrix
     
-    # Core competencies
-    primary_categories: List[TaskCategory]
-    secondary_categories: List[TaskCategory] = field(default_factory=list)
+    Membership, iteration and length read the matrix roster when used,
+    so reviewers do not each hold a copy of every agent id. The roster
+    itself is fixed once the matrix is built.
+    """
+    __slots__ = ('_matrix',)
     
-    # Technical skills
-    languages: List[ProgrammingLanguage] = field(default_factory=list)
-    frameworks: List[Framework] = field(default_factory=list)
+    def __init__(self, matrix: 'AgentCapabilityMatrix'):
+        self._matrix = matrix
     
-    # Complexity handling
-    max_complexity: TaskComplexity = TaskComplexity.COMPLEX
-    preferred_complexity: TaskComplexity = TaskComplexity.MODERATE
+    def __contains__(self, agent_id: object) -> bool:
+        return agent_id in self._matrix.agents
     
-    # Special capabilities
-    can_test: bool = False
-    can_review: bool = False
-    can_deploy: bool = False
-    can_document: bool = False
-    can_refactor: bool = False
-    can_debug: bool = False
-    can_research: bool = False
-    can_architect: bool = False
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._matrix.agents)
     
-    # MCP servers (if applicable)
-    mcp_servers: List[str] = field(default_factory=list)
+    def __len__(self) -> int:
+        return len(self._matrix.agents)
     
-    # Performance metrics
-    success_rate: float = 0.95  # Historical success rate
-    avg_completion_time: float = 1.0  # Relative time (1.0 = average)
+    def __repr__(self) -> str:
+        return 'ALL_AGENTS'
+
+
+# Testing agents complement developers; reviewers work with everyone
+_TEST_AGENTS = frozenset({'test-automator', 'qa-expert'})
+_TEST_PARTNERS = frozenset({'python-pro', 'frontend-developer', 'typescript-pro'})
+_REVIEWERS = frozenset({'code-reviewer', 'architect-reviewer'})
+
+# Boolean capability attributes tabulated per agent
+_CAPABILITY_FLAGS = (
+    'can_test', 'can_review', 'can_deploy', 'can_document',
+    'can_refactor', 'can_debug', 'can_research', 'can_architect'
+)
+
+
+def _task_vector(features: TaskFeatures) -> tuple:
+    """Pack the task features used for scoring into a hashable tuple of ints"""
+    return (
+        features.category_mask, len(features.categories),
+        features.language_mask, len(features.languages),
+        features.framework_mask, len(features.frameworks),
+        features.complexity_int, features.req_mask
+    )
+
+
+# Requirements that count towards minimal-team coverage
+_COVERAGE_REQUIREMENTS = REQ_TEST | REQ_REVIEW | REQ_DEPLOY
+
+
+def _coverage_kernel(primary_masks: tuple, secondary_masks: tuple,
+                     capability_masks: tuple, task: tuple) -> List[float]:
+    """
+    Requirement coverage of every agent row for one task vector
     
-    # Collaboration preferences
-    works_well_with: List[str] = field(default_factory=list)
-    conflicts_with: List[str] = field(default_factory=list)
+    One point per task category in the agent's primary categories, half a
+    point per category only in its secondary ones, and one point per
+    testing/review/deployment requirement the agent can meet.
+    """
+    task_categories = task[0]
+    requirements = task[7] & _COVERAGE_REQUIREMENTS
+    return [
+        (primary & task_categories).bit_count() +
+        0.5 * (secondary & ~primary & task_categories).bit_count() +
+        (requirements & capabilities).bit_count()
+        for primary, secondary, capabilities in zip(
+            primary_masks, secondary_masks, capability_masks)
+    ]
+
+
+def _score_kernel(primary_masks: tuple, secondary_masks: tuple,
+                  language_masks: tuple, framework_masks: tuple,
+                  capability_masks: tuple, max_complexities: tuple,
+                  preferred_complexities: tuple, task: tuple) -> List[float]:
+    """
+    Score every agent row of the packed tables against one task vector
     
-    def matches_task(self, features: TaskFeatures) -> float:
-        """Calculate how well this agent matches a task (0.0 to 1.0)"""
-        score = 0.0
+    Each score runs from 0.0 to 1.0; rows sharing no category with the
+    task score 0.0 without further work.
+    """
+    (task_categories, category_count, task_languages, language_count,
+     task_frameworks, framework_count, complexity, requirements) = task
+    
+    scores = []
+    append = scores.append
+    for (primary, secondary, languages, frameworks, capabilities,
+         max_complexity, preferred_complexity) in zip(
+            primary_masks, secondary_masks, language_masks, framework_masks,
+            capability_masks, max_complexities, preferred_complexities):
+        if category_count and not (primary | secondary) & task_categories:
+            append(0.0)
+            continue
         
         # Category matching (40% weight)
         category_score = 0.0
-        for category in features.categories:
-            if category in self.primary_categories:
-                category_score += 1.0
-            elif category in self.secondary_categories:
-                category_score += 0.5
-        
-        if features.categories:
-            category_score /= len(features.categories)
-        score += category_score * 0.4
+        if category_count:
+            category_score = ((primary & task_categories).bit_count() +
+                              0.5 * (secondary & ~primary & task_categories).bit_count())
+            category_score /= category_count
         
         # Language matching (25% weight)
-        language_score = 0.0
-        if features.languages:
-            matching_languages = set(features.languages) & set(self.languages)
-            language_score = len(matching_languages) / len(features.languages)
-        elif not self.languages:  # No specific language requirement
-            language_score = 1.0
-        score += language_score * 0.25
+        if language_count:
+            language_score = (languages & task_languages).bit_count() / language_count
+        else:  # Full marks only without a specific language requirement
+            language_score = 1.0 if not languages else 0.0
         
         # Framework matching (15% weight)
-        framework_score = 0.0
-        if features.frameworks:
-            matching_frameworks = set(features.frameworks) & set(self.frameworks)
-            framework_score = len(matching_frameworks) / len(features.frameworks)
-        elif not self.frameworks:  # No specific framework requirement
-            framework_score = 1.0
-        score += framework_score * 0.15
+        if framework_count:
+            framework_score = (frameworks & task_frameworks).bit_count() / framework_count
+        else:  # Full marks only without a specific framework requirement
+            framework_score = 1.0 if not frameworks else 0.0
         
         # Complexity matching (10% weight)
         complexity_score = 0.0
-        if features.complexity.value <= self.max_complexity.value:
+        if complexity <= max_complexity:
             complexity_score = 1.0
-            if features.complexity == self.preferred_complexity:
-                complexity_score = 1.0
-            else:
+            if complexity != preferred_complexity:
                 # Penalize for complexity mismatch
-                diff = abs(features.complexity.value.count('_') - 
-                          self.preferred_complexity.value.count('_'))
+                diff = abs(complexity - preferred_complexity)
                 complexity_score = max(0.5, 1.0 - (diff * 0.2))
-        score += complexity_score * 0.1
-        
-        # Special requirements matching (10% weight)
-        special_score = 1.0
-        requirement_count = 0
         
-        if features.requires_testing:
-            requirement_count += 1
-            if not self.can_test:
-                special_score -= 0.2
+        # Special requirements matching (10% weight): -0.2 per unmet requirement
+        special_score = _SPECIAL_SCORES[(requirements & ~capabilities).bit_count()]
         
-        if features.requires_review:
-            requirement_count += 1
-            if not self.can_review:
-                special_score -= 0.2
-        
-        if features.requires_deployment:
-            requirement_count += 1
-            if not self.can_deploy:
-                special_score -= 0.2
-        
-        if features.is_bug_fix:
-            requirement_count += 1
-            if not self.can_debug:
-                special_score -= 0.2
-        
-        if features.is_refactoring:
-            requirement_count += 1
-            if not self.can_refactor:
-                special_score -= 0.2
-        
-        score += max(0, special_score) * 0.1
-        
-        return min(1.0, score)
+        append(min(1.0, max(0.0, category_score * 0.4 + language_score * 0.25 +
+                            framework_score * 0.15 + complexity_score * 0.1 +
+                            special_score * 0.1)))
+    
+    return scores
+
+
+@lru_cache(maxsize=4096)
+def _score_row(primary: int, secondary: int, languages: int, frameworks: int,
+               capabilities: int, max_complexity: int,
+               preferred_complexity: int, task: tuple) -> float:
+    """
+    Score one agent row against a packed task vector (0.0 to 1.0)
+    
+    The arguments are the packed row and task contents themselves, so
+    memoised results never go stale when agents or tasks change.
+    """
+    return _score_kernel((primary,), (secondary,), (languages,), (frameworks,),
+                         (capabilities,), (max_complexity,),
+                         (preferred_complexity,), task)[0]
+
+
+class AgentCapability:
+    """Defines capabilities of a single agent"""
+    
+    __slots__ = (
+        'agent_id', 'agent_type', 'description',
+        'primary_categories', 'secondary_categories', 'languages', 'frameworks',
+        'max_complexity', 'preferred_complexity',
+        'can_test', 'can_review', 'can_deploy', 'can_document', 'can_refactor',
+        'can_debug', 'can_research', 'can_architect',
+        'mcp_servers', 'success_rate', 'avg_completion_time',
+        'works_well_with', 'conflicts_with',
+        # Derived lookup state
+        '_primary_set', '_secondary_set', '_cat_set', '_lang_set', '_fw_set',
+        '_works_well_with_set', '_primary_mask', '_secondary_mask',
+        '_language_mask', '_framework_mask', '_capability_mask',
+        '_max_complexity_ord', '_preferred_complexity_ord', '_score_args'
+    )
+    
+    def __init__(self,
+                 agent_id: str,
+                 agent_type: str,
+                 description: str,
+                 primary_categories: Sequence[TaskCategory],
+                 secondary_categories: Sequence[TaskCategory] = (),
+                 languages: Sequence[ProgrammingLanguage] = (),
+                 frameworks: Sequence[Framework] = (),
+                 max_complexity: TaskComplexity = TaskComplexity.COMPLEX,
+                 preferred_complexity: TaskComplexity = TaskComplexity.MODERATE,
+                 can_test: bool = False,
+                 can_review: bool = False,
+                 can_deploy: bool = False,
+                 can_document: bool = False,
+                 can_refactor: bool = False,
+                 can_debug: bool = False,
+                 can_research: bool = False,
+                 can_architect: bool = False,
+                 mcp_servers: Sequence[str] = (),
+                 success_rate: float = 0.95,
+                 avg_completion_time: float = 1.0,
+                 works_well_with: Sequence[str] = (),
+                 conflicts_with: Sequence[str] = ()):
+        self.agent_id = agent_id
+        self.agent_type = agent_type
+        self.description = description
+        
+        # Core competencies
+        self.primary_categories = primary_categories
+        self.secondary_categories = secondary_categories
+        
+        # Technical skills
+        self.languages = languages
+        self.frameworks = frameworks
+        
+        # Complexity handling
+        self.max_complexity = max_complexity
+        self.preferred_complexity = preferred_complexity
+        
+        # Special capabilities
+        self.can_test = can_test
+        self.can_review = can_review
+        self.can_deploy = can_deploy
+        self.can_document = can_document
+        self.can_refactor = can_refactor
+        self.can_debug = can_debug
+        self.can_research = can_research
+        self.can_architect = can_architect
+        
+        # MCP servers (if applicable)
+        self.mcp_servers = mcp_servers
+        
+        # Performance metrics
+        self.success_rate = success_rate  # Historical success rate
+        self.avg_completion_time = avg_completion_time  # Relative time (1.0 = average)
+        
+        # Collaboration preferences; the matrix gives reviewers an
+        # all-agents view supporting `in`, iteration and len(), not indexing
+        self.works_well_with = works_well_with
+        self.conflicts_with = conflicts_with
+        
+        # Set views for O(1) membership tests; the sequences stay the public API
+        self._primary_set = frozenset(primary_categories)
+        self._secondary_set = frozenset(secondary_categories)
+        self._cat_set = self._primary_set | self._secondary_set
+        self._lang_set = frozenset(languages)
+        self._fw_set = frozenset(frameworks)
+        self._works_well_with_set = frozenset(works_well_with)
+        
+        # Packed row used by matches_task and the matrix score tables
+        self._primary_mask = _bitmask(self._primary_set, CATEGORY_BITS)
+        self._secondary_mask = _bitmask(self._secondary_set, CATEGORY_BITS)
+        self._language_mask = _bitmask(self._lang_set, LANGUAGE_BITS)
+        self._framework_mask = _bitmask(self._fw_set, FRAMEWORK_BITS)
+        self._capability_mask = (
+            (REQ_TEST if can_test else 0) |
+            (REQ_REVIEW if can_review else 0) |
+            (REQ_DEPLOY if can_deploy else 0) |
+            (REQ_DEBUG if can_debug else 0) |
+            (REQ_REFACTOR if can_refactor else 0)
+        )
+        self._max_complexity_ord = int(max_complexity)
+        self._preferred_complexity_ord = int(preferred_complexity)
+        
+        # The whole packed row in one slot, so scoring does a single load
+        self._score_args = (
+            self._primary_mask, self._secondary_mask,
+            self._language_mask, self._framework_mask, self._capability_mask,
+            self._max_complexity_ord, self._preferred_complexity_ord
+        )
+    
+    def __repr__(self) -> str:
+        return f"AgentCapability(agent_id={self.agent_id!r}, agent_type={self.agent_type!r})"
+    
+    def compatible_with(self, matrix: 'AgentCapabilityMatrix', other_id: str) -> bool:
+        """Check whether this agent works well with another agent"""
+        if isinstance(self.works_well_with, _AllAgents):
+            return other_id in matrix.agents
+        return other_id in self._works_well_with_set
+    
+    def matches_task(self, features: TaskFeatures) -> float:
+        """Calculate how well this agent matches a task (0.0 to 1.0)"""
+        # Agents outside every task category are not candidates
+        if features.categories and self._cat_set.isdisjoint(features.categories_set):
+            return 0.0
+        return _score_row(*self._score_args, _task_vector(features))
 
 
 class AgentCapabilityMatrix:
@@ -546,64 +714,160 @@ class AgentCapabilityMatrix:
         
         # Set up collaboration preferences
         self._setup_collaborations()
+        
+        # Build lookup indexes and struct-of-arrays score tables
+        self._build_indexes()
+        self._build_score_tables()
     
     def _setup_collaborations(self):
         """Set up agent collaboration preferences"""
         
-        # Python agents work well together
-        python_agents = ['python-pro', 'data-analyst', 'data-scientist', 
-                        'data-engineer', 'ai-engineer']
-        for agent_id in python_agents:
-            if agent_id in self.agents:
-                self.agents[agent_id].works_well_with.extend(
-                    [a for a in python_agents if a != agent_id]
-                )
-        
-        # Frontend agents work well together
-        frontend_agents = ['frontend-developer', 'typescript-pro', 
-                          'nextjs-developer', 'ux-researcher']
-        for agent_id in frontend_agents:
-            if agent_id in self.agents:
-                self.agents[agent_id].works_well_with.extend(
-                    [a for a in frontend_agents if a != agent_id]
-                )
+        # Collect into sets so overlapping groups cannot add duplicates
+        collaborations = {
+            agent_id: set(agent.works_well_with)
+            for agent_id, agent in self.agents.items()
+        }
+        
+        # Python and frontend agents work well within their group
+        for group in (_PYTHON_GROUP, _FRONTEND_GROUP):
+            for agent_id in group & collaborations.keys():
+                collaborations[agent_id] |= group - {agent_id}
         
         # Testing agents complement developers
-        for test_agent in ['test-automator', 'qa-expert']:
-            if test_agent in self.agents:
-                self.agents[test_agent].works_well_with.extend(
-                    ['python-pro', 'frontend-developer', 'typescript-pro']
-                )
-        
-        # Reviewers work with everyone
-        for reviewer in ['code-reviewer', 'architect-reviewer']:
-            if reviewer in self.agents:
-                self.agents[reviewer].works_well_with = list(self.agents.keys())
+        for agent_id in _TEST_AGENTS & collaborations.keys():
+            collaborations[agent_id] |= _TEST_PARTNERS
+        
+        # Ids are interned so collaborator lookups compare by identity; the
+        # dict is rebuilt because assigning to an existing key keeps the old
+        # key object.
+        agents = {}
+        for agent_id, collaborators in collaborations.items():
+            agent = self.agents[agent_id]
+            agent.agent_id = sys.intern(agent_id)
+            agent.conflicts_with = [sys.intern(a) for a in agent.conflicts_with]
+            if agent_id in _REVIEWERS:
+                # Reviewers work with everyone: a live view of the roster
+                # instead of a copy of every id
+                agent.works_well_with = _AllAgents(self)
+                agent._works_well_with_set = frozenset()
+            else:
+                agent.works_well_with = sorted(map(sys.intern, collaborators))
+                agent._works_well_with_set = frozenset(agent.works_well_with)
+            agents[agent.agent_id] = agent
+        self.agents = agents
+    
+    def _build_indexes(self):
+        """Build category/language/framework -> agents indexes in roster order"""
+        # Roster as a tuple plus id -> position, for ordered walks and lookups
+        self._agents_tuple: Tuple[AgentCapability, ...] = tuple(self.agents.values())
+        self._index: Dict[str, int] = {
+            agent.agent_id: i for i, agent in enumerate(self._agents_tuple)
+        }
+        
+        self._by_category: Dict[TaskCategory, List[AgentCapability]] = {
+            category: [] for category in TaskCategory
+        }
+        self._by_language: Dict[ProgrammingLanguage, List[AgentCapability]] = {
+            language: [] for language in ProgrammingLanguage
+        }
+        self._by_framework: Dict[Framework, List[AgentCapability]] = {
+            framework: [] for framework in Framework
+        }
+        
+        for agent in self._agents_tuple:
+            for category in agent._cat_set:
+                self._by_category[category].append(agent)
+            
+            # Agents without a language/framework list handle any of them
+            for language in agent._lang_set or self._by_language:
+                self._by_language[language].append(agent)
+            for framework in agent._fw_set or self._by_framework:
+                self._by_framework[framework].append(agent)
+    
+    def _build_score_tables(self):
+        """Build parallel per-agent masks used by score_all"""
+        self._agent_ids = tuple(agent.agent_id for agent in self._agents_tuple)
+        (self._primary_cat_mask, self._secondary_cat_mask,
+         self._lang_mask, self._fw_mask, self._cap_mask,
+         self._max_complexity, self._preferred_complexity) = zip(
+            *(agent._score_args for agent in self._agents_tuple)
+        )
+        self._capability_flags: Dict[str, Tuple[bool, ...]] = {
+            flag: tuple(getattr(agent, flag) for agent in self._agents_tuple)
+            for flag in _CAPABILITY_FLAGS
+        }
+    
+    def score_all(self, features: TaskFeatures) -> List[float]:
+        """Score every agent against a task, in ``self.agents`` order"""
+        return self.score_packed(_task_vector(features))
+    
+    def coverage_all(self, features: TaskFeatures) -> List[float]:
+        """Requirement coverage of every agent for a task, in ``self.agents`` order"""
+        return _coverage_kernel(
+            self._primary_cat_mask, self._secondary_cat_mask, self._cap_mask,
+            _task_vector(features)
+        )
+    
+    def pack_task(self, features: TaskFeatures) -> tuple:
+        """Pack the scoring-relevant task features into a hashable tuple"""
+        return _task_vector(features)
+    
+    def score_packed(self, task: tuple) -> List[float]:
+        """Score every agent against a task packed by ``pack_task``"""
+        return _score_kernel(
+            self._primary_cat_mask, self._secondary_cat_mask,
+            self._lang_mask, self._fw_mask, self._cap_mask,
+            self._max_complexity, self._preferred_complexity,
+            task
+        )
+    
+    def score_matrix(self, features_list: Sequence[TaskFeatures]) -> List[List[float]]:
+        """Score every agent against several tasks as a [task][agent] matrix"""
+        tables = (
+            self._primary_cat_mask, self._secondary_cat_mask,
+            self._lang_mask, self._fw_mask, self._cap_mask,
+            self._max_complexity, self._preferred_complexity
+        )
+        
+        # Tasks that pack to the same vector share one scored row
+        rows: Dict[tuple, List[float]] = {}
+        matrix = []
+        for features in features_list:
+            task = _task_vector(features)
+            row = rows.get(task)
+            if row is None:
+                row = rows[task] = _score_kernel(*tables, task)
+            matrix.append(list(row))
+        return matrix
     
     def get_agent(self, agent_id: str) -> Optional[AgentCapability]:
         """Get agent capability by ID"""
-        return self.agents.get(agent_id)
+        index = self._index.get(agent_id)
+        return None if index is None else self._agents_tuple[index]
     
     def get_agents_for_category(self, category: TaskCategory) -> List[AgentCapability]:
         """Get all agents that can handle a category"""
-        agents = []
-        for agent in self.agents.values():
-            if category in agent.primary_categories or category in agent.secondary_categories:
-                agents.append(agent)
-        return agents
+        return list(self._by_category.get(category, ()))
     
     def get_agents_for_language(self, language: ProgrammingLanguage) -> List[AgentCapability]:
         """Get all agents that can handle a language"""
-        agents = []
-        for agent in self.agents.values():
-            if not agent.languages or language in agent.languages:
-                agents.append(agent)
-        return agents
+        return list(self._by_language.get(language, ()))
     
     def get_agents_for_framework(self, framework: Framework) -> List[AgentCapability]:
         """Get all agents that can handle a framework"""
-        agents = []
-        for agent in self.agents.values():
-            if not agent.frameworks or framework in agent.frameworks:
-                agents.append(agent)
-        return agents
\ No newline at end of file
+        return list(self._by_framework.get(framework, ()))
+
+
+# Global matrix instance
+_DEFAULT_MATRIX: Optional[AgentCapabilityMatrix] = None
+_DEFAULT_MATRIX_LOCK = threading.Lock()
+
+
+def get_default_matrix() -> AgentCapabilityMatrix:
+    """Get the shared capability matrix, building it on first use"""
+    global _DEFAULT_MATRIX
+    if _DEFAULT_MATRIX is None:
+        with _DEFAULT_MATRIX_LOCK:
+            if _DEFAULT_MATRIX is None:
+                _DEFAULT_MATRIX = AgentCapabilityMatrix()
+    return _DEFAULT_MATRIX
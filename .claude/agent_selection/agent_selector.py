@@ -3,21 +3,17 @@ Automated agent selection system based on task requirements
 """
 
 import logging
-from typing import Dict, List, Set, Optional, Tuple, Any
+from collections import Counter, deque
+from itertools import chain, takewhile
+from typing import Dict, List, Optional, Tuple, Any, Iterator, NamedTuple, Sequence, Deque
 from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from agent_selection.task_classifier import (
-    TaskClassifier, TaskFeatures, TaskCategory, 
-    TaskComplexity, ProgrammingLanguage
-)
-from agent_selection.agent_capabilities import (
-    AgentCapabilityMatrix, AgentCapability
+from .task_classifier import (
+    TaskClassifier, TaskFeatures, TaskCategory, ProgrammingLanguage
 )
+from .agent_capabilities import AgentCapability, get_default_matrix
 
 
 class SelectionStrategy(Enum):
@@ -29,7 +25,7 @@ class SelectionStrategy(Enum):
     FULL_TEAM = "full_team"              # All relevant agents
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentScore:
     """Score for an agent-task match"""
     agent_id: str
@@ -37,6 +33,7 @@ class AgentScore:
     confidence: float   # 0.0 to 1.0
     reasons: List[str] = field(default_factory=list)
     penalties: List[str] = field(default_factory=list)
+    agent_idx: int = -1  # Position in the capability matrix roster
     
     @property
     def final_score(self) -> float:
@@ -44,7 +41,16 @@ class AgentScore:
         return self.match_score * self.confidence
 
 
-@dataclass
+class _RankedAgent(NamedTuple):
+    """Agent ranking entry used by team selection"""
+    agent_idx: int       # Position in the capability matrix roster
+    agent_id: str
+    match_score: float   # Adjusted for performance and complexity
+    final_score: float   # match_score weighted by classification confidence
+    base_score: float    # Raw capability match
+
+
+@dataclass(slots=True)
 class TeamComposition:
     """Recommended team of agents for a task"""
     primary_agents: List[str]      # Main agents for the task
@@ -56,15 +62,41 @@ class TeamComposition:
     reasoning: str                  # Explanation of selection
     workflow_suggestion: str        # Suggested workflow type
     
+    # Classified task features the team was selected for
+    features: Optional[TaskFeatures] = field(default=None, repr=False, compare=False)
+    
+    # Explained scores of the selected agents only, in rank order
+    agent_scores: Dict[str, AgentScore] = field(default_factory=dict, repr=False, compare=False)
+    
+    # Deduplicated agent list with the role-list lengths it was built from
+    _all_agents: Optional[Tuple[Tuple[int, int, int], Tuple[str, ...]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
     def get_all_agents(self) -> List[str]:
         """Get all agents in the team"""
-        all_agents = []
-        all_agents.extend(self.primary_agents)
-        all_agents.extend(self.support_agents)
-        all_agents.extend(self.review_agents)
-        # Remove duplicates while preserving order
-        seen = set()
-        return [x for x in all_agents if not (x in seen or seen.add(x))]
+        # Role lists are only ever appended to after construction, so their
+        # lengths tell whether the cached result is still current
+        sizes = (len(self.primary_agents), len(self.support_agents), len(self.review_agents))
+        if self._all_agents is None or self._all_agents[0] != sizes:
+            # Remove duplicates while preserving order
+            self._all_agents = (sizes, tuple(dict.fromkeys(chain(
+                self.primary_agents, self.support_agents, self.review_agents
+            ))))
+        return list(self._all_agents[1])
+
+
+# Base time per complexity level, indexed by TaskComplexity
+_BASE_TIME = (0.2, 0.5, 1.0, 2.0, 3.0)
+
+# Time multiplier by agent count (diminishing returns); the last entry
+# covers six or more agents, where coordination overhead kicks in
+_TIME_MULTIPLIER = (0.5, 1.0, 0.7, 0.6, 0.5, 0.5, 0.6)
+
+
+def _above_threshold(scores: Sequence[_RankedAgent], threshold: float) -> Iterator[_RankedAgent]:
+    """Leading run of ranked scores whose final score meets a threshold"""
+    return takewhile(lambda score: score.final_score >= threshold, scores)
 
 
 class AgentSelector:
@@ -76,13 +108,25 @@ class AgentSelector:
         
         # Initialize components
         self.task_classifier = TaskClassifier()
-        self.capability_matrix = AgentCapabilityMatrix()
+        self.capability_matrix = get_default_matrix()
         
-        # Selection history for learning
-        self.selection_history: List[Tuple[TaskFeatures, TeamComposition]] = []
+        # Selection history for learning, capped to the most recent selections
+        self.selection_history: Deque[Tuple[TaskFeatures, TeamComposition]] = deque(
+            maxlen=self.config.get('history_cap', 10_000))
+        
+        # Running totals over the retained history for get_selection_statistics
+        self._category_counts: Counter = Counter()
+        self._agent_counts: Counter = Counter()
+        self._workflow_counts: Counter = Counter()
+        self._team_size_total = 0
         
         # Performance tracking
         self.agent_performance: Dict[str, Dict[str, float]] = {}
+        self._perf_multipliers = [1.0] * len(self.capability_matrix._agent_ids)
+        
+        # Scoring is deterministic given the features and performance data,
+        # so results are memoised per instance (cleared on performance updates)
+        self._score_agents_cached = lru_cache(maxsize=512)(self._compute_scores)
     
     def select_agents(self, 
                       task_description: str,
@@ -103,11 +147,40 @@ class AgentSelector:
         # Classify the task
         features = self.task_classifier.classify_task(task_description, context)
         
-        self.logger.info(f"Task classified: {features.categories}, "
-                        f"complexity: {features.complexity.value}")
+        return self._select_team(features, strategy)
+    
+    def select_agents_batch(self,
+                            task_descriptions: List[str],
+                            strategy: SelectionStrategy = SelectionStrategy.SPECIALIZED_TEAM,
+                            context: Optional[Dict[str, Any]] = None) -> List[TeamComposition]:
+        """
+        Select agents for several tasks
+        
+        All tasks are classified up front; tasks that classify to the same
+        features share one cached ranking.
+        
+        Args:
+            task_descriptions: Natural language task descriptions
+            strategy: Selection strategy to use for every task
+            context: Additional context shared by all tasks
+        
+        Returns:
+            One TeamComposition per task, in input order
+        """
+        
+        features_list = self.task_classifier.classify_batch(task_descriptions, context)
+        return [self._select_team(features, strategy) for features in features_list]
+    
+    def _select_team(self,
+                     features: TaskFeatures,
+                     strategy: SelectionStrategy) -> TeamComposition:
+        """Score agents for classified features and select a team"""
+        
+        self.logger.debug("Task classified: %s, complexity: %s",
+                          features.categories, features.complexity.label)
         
         # Score all agents
-        agent_scores = self._score_agents(features)
+        agent_scores = self._rank_agents(features)
         
         # Select team based on strategy
         if strategy == SelectionStrategy.BEST_MATCH:
@@ -120,81 +193,132 @@ class AgentSelector:
             team = self._select_minimal_team(agent_scores, features)
         else:  # FULL_TEAM
             team = self._select_full_team(agent_scores, features)
+        team.features = features
+        
+        # Explanations are only built for the agents that made the team
+        selected = set(team.get_all_agents())
+        team.agent_scores = {
+            ranked.agent_id: self._materialize(ranked, features)
+            for ranked in agent_scores if ranked.agent_id in selected
+        }
         
-        # Add to history
-        self.selection_history.append((features, team))
+        # Add to history, retiring the oldest entry once the cap is reached
+        history = self.selection_history
+        if history.maxlen is not None and len(history) == history.maxlen:
+            self._count_selection(*history[0], -1)
+        history.append((features, team))
+        self._count_selection(features, team, 1)
         
-        self.logger.info(f"Selected {team.total_agents} agents: "
-                        f"Primary: {team.primary_agents}")
+        self.logger.debug("Selected %d agents: Primary: %s",
+                          team.total_agents, team.primary_agents)
         
         return team
     
-    def _score_agents(self, features: TaskFeatures) -> List[AgentScore]:
-        """Score all agents for task features"""
-        scores = []
+    def _materialize(self, ranked: _RankedAgent, features: TaskFeatures) -> AgentScore:
+        """Build the explained score for one ranked agent, with reasons and penalties"""
+        
+        agent = self.capability_matrix._agents_tuple[ranked.agent_idx]
+        multiplier = self._perf_multipliers[ranked.agent_idx]
+        return AgentScore(
+            agent_id=ranked.agent_id,
+            match_score=ranked.match_score,
+            confidence=features.confidence,
+            reasons=self._explain_score(agent, ranked.base_score, features, multiplier),
+            penalties=self._score_penalties(agent, features, multiplier),
+            agent_idx=ranked.agent_idx
+        )
+    
+    def _rank_agents(self, features: TaskFeatures) -> Tuple[_RankedAgent, ...]:
+        """Rank all agents for task features without building explanations"""
+        return self._score_agents_cached(
+            (self.capability_matrix.pack_task(features), features.confidence)
+        )
+    
+    def _compute_scores(self, key: tuple) -> Tuple[_RankedAgent, ...]:
+        """Rank the whole roster for a packed task and confidence"""
+        task, confidence = key
+        matrix = self.capability_matrix
+        agent_ids = matrix._agent_ids
+        complexity = task[6]
+        
+        # Calculate base match scores for the whole roster in one pass
+        match_scores = matrix.score_packed(task)
+        
+        # Adjusted scores per agent: performance, complexity penalty, cap at 1.0
+        adjusted = [
+            min(1.0, match_score * multiplier *
+                (0.5 if complexity > max_complexity else 1.0))
+            for match_score, multiplier, max_complexity in zip(
+                match_scores, self._perf_multipliers, matrix._max_complexity)
+        ]
+        
+        # Rank by final score, computed once per agent; sorted() is stable,
+        # so ties keep roster order
+        final_scores = [score * confidence for score in adjusted]
+        ranking = sorted(range(len(final_scores)),
+                         key=final_scores.__getitem__, reverse=True)
+        
+        return tuple(
+            _RankedAgent(i, agent_ids[i], adjusted[i], final_scores[i], match_scores[i])
+            for i in ranking
+        )
+    
+    def _explain_score(self,
+                       agent: AgentCapability,
+                       match_score: float,
+                       features: TaskFeatures,
+                       multiplier: float) -> List[str]:
+        """Reasons behind an agent's score"""
+        
+        reasons = []
+        
+        # Add reasoning
+        if match_score > 0.8:
+            reasons.append("Excellent match for task requirements")
+        elif match_score > 0.6:
+            reasons.append("Good match for task requirements")
+        elif match_score > 0.4:
+            reasons.append("Moderate match for task requirements")
+        
+        # Check specific matches
+        for category in features.categories:
+            if category in agent._primary_set:
+                reasons.append(f"Primary expertise in {category.value}")
+            elif category in agent._secondary_set:
+                reasons.append(f"Secondary expertise in {category.value}")
+        
+        # Language matches
+        if features.languages:
+            matching_langs = agent._lang_set.intersection(features.languages)
+            if matching_langs:
+                lang_names = [l.value for l in matching_langs]
+                reasons.append(f"Proficient in {', '.join(lang_names)}")
+        
+        # Performance-based adjustments
+        if multiplier == 1.1:
+            reasons.append("High historical success rate")
+        
+        return reasons
+    
+    def _score_penalties(self,
+                         agent: AgentCapability,
+                         features: TaskFeatures,
+                         multiplier: float) -> List[str]:
+        """Penalties applied to an agent's score"""
         
-        for agent_id, agent in self.capability_matrix.agents.items():
-            # Calculate base match score
-            match_score = agent.matches_task(features)
-            
-            # Initialize score
-            score = AgentScore(
-                agent_id=agent_id,
-                match_score=match_score,
-                confidence=features.confidence
-            )
-            
-            # Add reasoning
-            if match_score > 0.8:
-                score.reasons.append("Excellent match for task requirements")
-            elif match_score > 0.6:
-                score.reasons.append("Good match for task requirements")
-            elif match_score > 0.4:
-                score.reasons.append("Moderate match for task requirements")
-            
-            # Check specific matches
-            for category in features.categories:
-                if category in agent.primary_categories:
-                    score.reasons.append(f"Primary expertise in {category.value}")
-                elif category in agent.secondary_categories:
-                    score.reasons.append(f"Secondary expertise in {category.value}")
-            
-            # Language matches
-            if features.languages:
-                matching_langs = set(features.languages) & set(agent.languages)
-                if matching_langs:
-                    lang_names = [l.value for l in matching_langs]
-                    score.reasons.append(f"Proficient in {', '.join(lang_names)}")
-            
-            # Apply performance-based adjustments
-            if agent_id in self.agent_performance:
-                perf = self.agent_performance[agent_id]
-                if 'success_rate' in perf:
-                    # Boost score for high performers
-                    if perf['success_rate'] > 0.95:
-                        score.match_score *= 1.1
-                        score.reasons.append("High historical success rate")
-                    elif perf['success_rate'] < 0.8:
-                        score.match_score *= 0.9
-                        score.penalties.append("Lower historical success rate")
-            
-            # Complexity penalties
-            if features.complexity.value > agent.max_complexity.value:
-                score.match_score *= 0.5
-                score.penalties.append("Task complexity exceeds agent capability")
-            
-            # Cap score at 1.0
-            score.match_score = min(1.0, score.match_score)
-            
-            scores.append(score)
+        penalties = []
+        
+        if multiplier == 0.9:
+            penalties.append("Lower historical success rate")
         
-        # Sort by final score
-        scores.sort(key=lambda x: x.final_score, reverse=True)
+        # Complexity penalties
+        if features.complexity_int > agent._max_complexity_ord:
+            penalties.append("Task complexity exceeds agent capability")
         
-        return scores
+        return penalties
     
     def _select_best_match(self, 
-                          scores: List[AgentScore],
+                          scores: Sequence[_RankedAgent],
                           features: TaskFeatures) -> TeamComposition:
         """Select single best matching agent"""
         
@@ -217,9 +341,9 @@ class AgentSelector:
         
         # Add reviewer if needed and different agent available
         if features.requires_review and len(scores) > 1:
+            agents = self.capability_matrix._agents_tuple
             for score in scores[1:]:
-                agent = self.capability_matrix.get_agent(score.agent_id)
-                if agent and agent.can_review:
+                if agents[score.agent_idx].can_review:
                     team.review_agents.append(score.agent_id)
                     team.total_agents += 1
                     break
@@ -227,46 +351,57 @@ class AgentSelector:
         return team
     
     def _select_specialized_team(self,
-                                scores: List[AgentScore],
+                                scores: Sequence[_RankedAgent],
                                 features: TaskFeatures) -> TeamComposition:
         """Select team of specialists for different aspects"""
         
         primary_agents = []
         support_agents = []
         review_agents = []
-        used_agents = set()
+        used_agents = 0  # Bitset over roster indexes
+        agents = self.capability_matrix._agents_tuple
         
         # Select primary agents for each category
         for category in features.categories[:3]:  # Limit to top 3 categories
             # Find best agent for this category
             for score in scores:
-                if score.agent_id in used_agents:
+                agent_idx = score.agent_idx
+                if used_agents >> agent_idx & 1:
                     continue
                 
-                agent = self.capability_matrix.get_agent(score.agent_id)
-                if agent and category in agent.primary_categories:
+                if category in agents[agent_idx]._primary_set:
                     primary_agents.append(score.agent_id)
-                    used_agents.add(score.agent_id)
+                    used_agents |= 1 << agent_idx
                     break
         
         # If no specialists found, use best overall
         if not primary_agents and scores:
             primary_agents.append(scores[0].agent_id)
-            used_agents.add(scores[0].agent_id)
+            used_agents |= 1 << scores[0].agent_idx
+        
+        # Ranked candidates per needed capability, from one pass over the scores
+        candidates = self._rank_by_capability(scores, [
+            capability for needed, capability in (
+                (features.requires_testing, 'can_test'),
+                (features.requires_documentation, 'can_document'),
+                (features.requires_deployment, 'can_deploy'),
+                (features.requires_review, 'can_review')
+            ) if needed
+        ])
         
         # Add support agents for specific needs
         if features.requires_testing:
-            self._add_specialist(scores, used_agents, support_agents, 'can_test')
+            used_agents = self._add_specialist(candidates['can_test'], used_agents, support_agents)
         
         if features.requires_documentation:
-            self._add_specialist(scores, used_agents, support_agents, 'can_document')
+            used_agents = self._add_specialist(candidates['can_document'], used_agents, support_agents)
         
         if features.requires_deployment:
-            self._add_specialist(scores, used_agents, support_agents, 'can_deploy')
+            used_agents = self._add_specialist(candidates['can_deploy'], used_agents, support_agents)
         
         # Add reviewer if needed
         if features.requires_review:
-            self._add_specialist(scores, used_agents, review_agents, 'can_review')
+            used_agents = self._add_specialist(candidates['can_review'], used_agents, review_agents)
         
         # Calculate team metrics
         total_agents = len(primary_agents) + len(support_agents) + len(review_agents)
@@ -292,23 +427,20 @@ class AgentSelector:
         )
     
     def _select_redundant_team(self,
-                              scores: List[AgentScore],
+                              scores: Sequence[_RankedAgent],
                               features: TaskFeatures) -> TeamComposition:
         """Select redundant agents for reliability"""
         
         primary_agents = []
         used_categories = set()
+        agents = self.capability_matrix._agents_tuple
         
         # Select top 2-3 agents per category for redundancy
         for category in features.categories[:2]:  # Focus on top 2 categories
             agents_for_category = []
             
-            for score in scores:
-                if score.final_score < 0.5:  # Minimum threshold
-                    break
-                
-                agent = self.capability_matrix.get_agent(score.agent_id)
-                if agent and category in agent.primary_categories:
+            for score in _above_threshold(scores, 0.5):  # Minimum threshold
+                if category in agents[score.agent_idx]._primary_set:
                     agents_for_category.append(score.agent_id)
                     
                     if len(agents_for_category) >= 2:  # 2 agents per category
@@ -326,8 +458,7 @@ class AgentSelector:
         if features.requires_review:
             for score in scores:
                 if score.agent_id not in primary_agents:
-                    agent = self.capability_matrix.get_agent(score.agent_id)
-                    if agent and agent.can_review:
+                    if agents[score.agent_idx].can_review:
                         review_agents.append(score.agent_id)
                         break
         
@@ -345,7 +476,7 @@ class AgentSelector:
         )
     
     def _select_minimal_team(self,
-                           scores: List[AgentScore],
+                           scores: Sequence[_RankedAgent],
                            features: TaskFeatures) -> TeamComposition:
         """Select minimum agents needed"""
         
@@ -353,29 +484,12 @@ class AgentSelector:
         best_agent = None
         best_coverage = 0
         
-        for score in scores:
-            if score.final_score < 0.4:  # Minimum threshold
-                continue
-            
-            agent = self.capability_matrix.get_agent(score.agent_id)
-            if not agent:
-                continue
-            
-            # Calculate requirement coverage
-            coverage = 0
-            for category in features.categories:
-                if category in agent.primary_categories:
-                    coverage += 1
-                elif category in agent.secondary_categories:
-                    coverage += 0.5
-            
-            # Check special requirements
-            if features.requires_testing and agent.can_test:
-                coverage += 1
-            if features.requires_review and agent.can_review:
-                coverage += 1
-            if features.requires_deployment and agent.can_deploy:
-                coverage += 1
+        # Requirement coverage for the whole roster in one pass
+        coverage_by_idx = self.capability_matrix.coverage_all(features)
+        
+        # Scores are ranked, so stop at the first one below the minimum threshold
+        for score in _above_threshold(scores, 0.4):
+            coverage = coverage_by_idx[score.agent_idx]
             
             if coverage > best_coverage:
                 best_coverage = coverage
@@ -398,30 +512,28 @@ class AgentSelector:
         )
     
     def _select_full_team(self,
-                         scores: List[AgentScore],
+                         scores: Sequence[_RankedAgent],
                          features: TaskFeatures) -> TeamComposition:
         """Select all relevant agents"""
         
         primary_agents = []
         support_agents = []
         review_agents = []
+        agents = self.capability_matrix._agents_tuple
+        categories = features.categories_set
+        requires_review = features.requires_review
         
         # Add all agents with reasonable scores
-        for score in scores:
-            if score.final_score < 0.3:  # Minimum relevance threshold
-                break
-            
-            agent = self.capability_matrix.get_agent(score.agent_id)
-            if not agent:
-                continue
+        for score in _above_threshold(scores, 0.3):  # Minimum relevance threshold
+            agent = agents[score.agent_idx]
             
             # Categorize by role
-            if any(cat in agent.primary_categories for cat in features.categories):
+            if not agent._primary_set.isdisjoint(categories):
                 if len(primary_agents) < 5:  # Limit primary agents
                     primary_agents.append(score.agent_id)
                 else:
                     support_agents.append(score.agent_id)
-            elif agent.can_review and features.requires_review:
+            elif agent.can_review and requires_review:
                 review_agents.append(score.agent_id)
             elif len(support_agents) < 5:  # Limit support agents
                 support_agents.append(score.agent_id)
@@ -439,51 +551,38 @@ class AgentSelector:
             workflow_suggestion="team-orchestration"
         )
     
-    def _add_specialist(self,
-                       scores: List[AgentScore],
-                       used_agents: Set[str],
-                       target_list: List[str],
-                       capability: str):
-        """Add a specialist agent with specific capability"""
+    def _rank_by_capability(self,
+                            scores: Sequence[_RankedAgent],
+                            capabilities: List[str]) -> Dict[str, List[_RankedAgent]]:
+        """Split ranked scores into per-capability candidate lists in one pass"""
+        
+        flags = self.capability_matrix._capability_flags
+        ranked = {capability: [] for capability in capabilities}
+        columns = [(flags[capability], ranked[capability]) for capability in capabilities]
         
         for score in scores:
-            if score.agent_id in used_agents:
-                continue
-            
-            agent = self.capability_matrix.get_agent(score.agent_id)
-            if agent and getattr(agent, capability, False):
+            for capable, candidates in columns:
+                if capable[score.agent_idx]:
+                    candidates.append(score)
+        
+        return ranked
+    
+    def _add_specialist(self,
+                       candidates: List[_RankedAgent],
+                       used_agents: int,
+                       target_list: List[str]) -> int:
+        """Add the best-ranked candidate not already on the team"""
+        
+        for score in candidates:
+            if not used_agents >> score.agent_idx & 1:
                 target_list.append(score.agent_id)
-                used_agents.add(score.agent_id)
-                break
+                return used_agents | 1 << score.agent_idx
+        return used_agents
     
     def _estimate_time(self, features: TaskFeatures, agent_count: int) -> float:
         """Estimate relative completion time"""
-        
-        # Base time from complexity
-        if features.complexity == TaskComplexity.TRIVIAL:
-            base_time = 0.2
-        elif features.complexity == TaskComplexity.SIMPLE:
-            base_time = 0.5
-        elif features.complexity == TaskComplexity.MODERATE:
-            base_time = 1.0
-        elif features.complexity == TaskComplexity.COMPLEX:
-            base_time = 2.0
-        else:  # VERY_COMPLEX
-            base_time = 3.0
-        
-        # Adjust for agent count (diminishing returns)
-        if agent_count == 1:
-            time_multiplier = 1.0
-        elif agent_count == 2:
-            time_multiplier = 0.7
-        elif agent_count == 3:
-            time_multiplier = 0.6
-        elif agent_count <= 5:
-            time_multiplier = 0.5
-        else:
-            time_multiplier = 0.6  # Too many agents cause overhead
-        
-        return base_time * time_multiplier
+        return (_BASE_TIME[features.complexity_int] *
+                _TIME_MULTIPLIER[min(agent_count, len(_TIME_MULTIPLIER) - 1)])
     
     def _generate_team_reasoning(self,
                                 primary: List[str],
@@ -539,58 +638,60 @@ class AgentSelector:
         
         perf['success_rate'] = perf['successful_tasks'] / perf['total_tasks']
         
+        # Score multiplier by roster index: boost high performers, damp low ones
+        agent_idx = self.capability_matrix._index.get(agent_id)
+        if agent_idx is not None:
+            if perf['success_rate'] > 0.95:
+                self._perf_multipliers[agent_idx] = 1.1
+            elif perf['success_rate'] < 0.8:
+                self._perf_multipliers[agent_idx] = 0.9
+            else:
+                self._perf_multipliers[agent_idx] = 1.0
+        
         if time_taken is not None:
             # Update average time (exponential moving average)
             alpha = 0.3  # Weight for new observation
             perf['avg_time'] = alpha * time_taken + (1 - alpha) * perf['avg_time']
         
-        self.logger.info(f"Updated performance for {agent_id}: "
-                        f"success_rate={perf['success_rate']:.2f}")
+        # Performance feeds the scores, so cached rankings are stale
+        self._score_agents_cached.cache_clear()
+        
+        self.logger.info("Updated performance for %s: success_rate=%.2f",
+                         agent_id, perf['success_rate'])
+    
+    def _count_selection(self, features: TaskFeatures, team: TeamComposition, sign: int):
+        """Add (sign=1) or remove (sign=-1) a selection from the running totals"""
+        
+        for category in features.categories:
+            self._category_counts[category.value] += sign
+        for agent_id in team.get_all_agents():
+            self._agent_counts[agent_id] += sign
+        self._workflow_counts[team.workflow_suggestion] += sign
+        self._team_size_total += sign * team.total_agents
+        
+        if sign < 0:
+            # Drop keys that fell out of the retained history
+            self._category_counts += Counter()
+            self._agent_counts += Counter()
+            self._workflow_counts += Counter()
     
     def get_selection_statistics(self) -> Dict[str, Any]:
         """Get statistics about agent selection"""
         
-        if not self.selection_history:
+        total_selections = len(self.selection_history)
+        if not total_selections:
             return {}
         
         stats = {
-            'total_selections': len(self.selection_history),
-            'avg_team_size': 0,
-            'category_frequency': {},
-            'agent_frequency': {},
-            'workflow_distribution': {}
+            'total_selections': total_selections,
+            'avg_team_size': self._team_size_total / total_selections,
+            'category_frequency': dict(self._category_counts),
+            'agent_frequency': dict(self._agent_counts),
+            'workflow_distribution': dict(self._workflow_counts)
         }
         
-        total_agents = 0
-        all_agents = []
-        
-        for features, team in self.selection_history:
-            # Team size
-            total_agents += team.total_agents
-            
-            # Categories
-            for category in features.categories:
-                cat_name = category.value
-                stats['category_frequency'][cat_name] = \
-                    stats['category_frequency'].get(cat_name, 0) + 1
-            
-            # Agents
-            for agent in team.get_all_agents():
-                all_agents.append(agent)
-                stats['agent_frequency'][agent] = \
-                    stats['agent_frequency'].get(agent, 0) + 1
-            
-            # Workflows
-            workflow = team.workflow_suggestion
-            stats['workflow_distribution'][workflow] = \
-                stats['workflow_distribution'].get(workflow, 0) + 1
-        
-        stats['avg_team_size'] = total_agents / len(self.selection_history)
-        
         # Most used agents
-        if all_agents:
-            from collections import Counter
-            agent_counts = Counter(all_agents)
-            stats['top_agents'] = agent_counts.most_common(5)
+        if self._agent_counts:
+            stats['top_agents'] = self._agent_counts.most_common(5)
         
-        return stats
\ No newline at end of file
+        return stats
@@ -2,17 +2,16 @@
 Task classification system for automated agent selection
 """
 
+import os
 import re
 import json
 import logging
-from typing import Dict, List, Set, Optional, Tuple, Any
-from dataclasses import dataclass, asdict
-from enum import Enum
-from pathlib import Path
-
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from functools import lru_cache
+from collections import Counter, deque
+from typing import Dict, List, Set, Optional, Tuple, Any, Deque, Mapping, Sequence, Union
+from dataclasses import dataclass, asdict, field, fields
+from enum import Enum, IntEnum
+from types import MappingProxyType
 
 
 class TaskCategory(Enum):
@@ -39,13 +38,17 @@ class TaskCategory(Enum):
     MAINTENANCE = "maintenance"
 
 
-class TaskComplexity(Enum):
-    """Task complexity levels"""
-    TRIVIAL = "trivial"      # Single file, simple change
-    SIMPLE = "simple"        # Few files, straightforward logic
-    MODERATE = "moderate"    # Multiple files, some complexity
-    COMPLEX = "complex"      # Many files, complex logic
-    VERY_COMPLEX = "very_complex"  # System-wide, architectural changes
+class TaskComplexity(IntEnum):
+    """Task complexity levels, ordered so they compare as integers"""
+    TRIVIAL = 0       # Single file, simple change
+    SIMPLE = 1        # Few files, straightforward logic
+    MODERATE = 2      # Multiple files, some complexity
+    COMPLEX = 3       # Many files, complex logic
+    VERY_COMPLEX = 4  # System-wide, architectural changes
+    
+    def __init__(self, value: int):
+        # Lowercase name used in serialized and displayed output
+        self.label = self.name.lower()
 
 
 class ProgrammingLanguage(Enum):
@@ -101,7 +104,122 @@ class Framework(Enum):
     WEBSOCKET = "websocket"
 
 
-@dataclass
+# Keyword groups behind the task characteristic flags, scanned together
+# with the category, language and framework keywords
+_CHARACTERISTIC_KEYWORDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'testing': ('test', 'testing', 'coverage', 'spec'),
+    'documentation': ('document', 'docs', 'readme', 'comment'),
+    'database': ('database', 'sql', 'query', 'table'),
+    'ui': ('ui', 'frontend', 'interface', 'component'),
+    'security': ('security', 'auth', 'permission', 'sensitive'),
+    'fix': ('fix',),
+    'new': ('new',),
+    'api': ('api',),
+    'review': ('review',)
+})
+
+# Estimated files affected, indexed by TaskComplexity
+_FILES_PER_COMPLEXITY = (1, 2, 5, 10, 20)
+
+# Languages recognised from context file extensions
+_EXTENSION_LANGUAGES = {
+    '.py': ProgrammingLanguage.PYTHON,
+    '.js': ProgrammingLanguage.JAVASCRIPT,
+    '.jsx': ProgrammingLanguage.JAVASCRIPT,
+    '.ts': ProgrammingLanguage.TYPESCRIPT,
+    '.tsx': ProgrammingLanguage.TYPESCRIPT,
+    '.rs': ProgrammingLanguage.RUST
+}
+
+
+def _file_suffix(path: Union[str, os.PathLike]) -> str:
+    """Lowercased final suffix of a path's last component, like Path(path).suffix"""
+    name = os.fspath(path).rstrip('/').rpartition('/')[2]
+    dot = name.rfind('.')
+    return name[dot:].lower() if 0 < dot < len(name) - 1 else ''
+
+
+# Words for keyword extraction and file extensions mentioned in a task
+_WORD_RE = re.compile(r'\b[a-z]+\b')
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be'
+})
+_EXT_RE = re.compile(r'\.\w{2,4}\b')
+
+
+# Requirement bits, matched against agent capability masks
+REQ_TEST = 1
+REQ_REVIEW = 2
+REQ_DEPLOY = 4
+REQ_DEBUG = 8
+REQ_REFACTOR = 16
+
+# Bit per enum member, used to pack enum lists into integer masks
+CATEGORY_BITS = {category: 1 << i for i, category in enumerate(TaskCategory)}
+LANGUAGE_BITS = {language: 1 << i for i, language in enumerate(ProgrammingLanguage)}
+FRAMEWORK_BITS = {framework: 1 << i for i, framework in enumerate(Framework)}
+
+
+def _bitmask(values, bits: Dict[Any, int]) -> int:
+    """Pack a collection of enum members into an integer mask"""
+    mask = 0
+    for value in values:
+        mask |= bits[value]
+    return mask
+
+
+def _keyword_trie_pattern(keywords: List[str]) -> str:
+    """Regex that matches the longest of the keywords starting at a position"""
+    trie: Dict[str, Any] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional: prefer a longer keyword, fall back to this one
+        return '(?:' + body + ')?' if '' in node else body
+    
+    return build(trie)
+
+
+def _compile_keyword_scanner(tagged_keywords: Dict[Any, Sequence[str]]) -> Tuple[re.Pattern, Dict[str, frozenset]]:
+    """
+    Compile tagged keyword lists into a single scanner
+    
+    The scanner is a zero-width lookahead, so findall() reports the longest
+    keyword starting at every position of the text in one pass, overlaps
+    included. Every keyword maps to the tags of itself and of all keywords
+    that are its prefixes, since those match at the same position. The tags
+    found are exactly those with a keyword occurring as a substring.
+    
+    Returns:
+        (scanner, keyword -> tags)
+    """
+    keyword_tags: Dict[str, Set[Any]] = {}
+    for tag, keywords in tagged_keywords.items():
+        for keyword in keywords:
+            keyword_tags.setdefault(keyword, set()).add(tag)
+    
+    tags_with_prefixes = {
+        keyword: frozenset().union(*(
+            keyword_tags[prefix] for prefix in keyword_tags if keyword.startswith(prefix)
+        ))
+        for keyword in keyword_tags
+    }
+    
+    scanner = re.compile('(?=(' + _keyword_trie_pattern(list(keyword_tags)) + '))')
+    return scanner, tags_with_prefixes
+
+
+@dataclass(slots=True)
 class TaskFeatures:
     """Features extracted from a task description"""
     categories: List[TaskCategory]
@@ -125,15 +243,188 @@ class TaskFeatures:
     has_security_implications: bool
     confidence: float  # 0.0 to 1.0
     
+    # Derived in __post_init__ for capability matching; not serialized
+    categories_set: frozenset = field(init=False, repr=False, compare=False)
+    category_mask: int = field(init=False, repr=False, compare=False)
+    language_mask: int = field(init=False, repr=False, compare=False)
+    framework_mask: int = field(init=False, repr=False, compare=False)
+    complexity_int: int = field(init=False, repr=False, compare=False)
+    req_mask: int = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Category set for candidate pruning in capability matching
+        self.categories_set = frozenset(self.categories)
+        
+        # Integer masks of the enum lists for capability matching
+        self.category_mask = _bitmask(self.categories, CATEGORY_BITS)
+        self.language_mask = _bitmask(self.languages, LANGUAGE_BITS)
+        self.framework_mask = _bitmask(self.frameworks, FRAMEWORK_BITS)
+        
+        # Plain int complexity for comparisons and table lookups
+        self.complexity_int = int(self.complexity)
+        
+        # Requirements packed once for capability matching
+        self.req_mask = (
+            (REQ_TEST if self.requires_testing else 0) |
+            (REQ_REVIEW if self.requires_review else 0) |
+            (REQ_DEPLOY if self.requires_deployment else 0) |
+            (REQ_DEBUG if self.is_bug_fix else 0) |
+            (REQ_REFACTOR if self.is_refactoring else 0)
+        )
+    
     def to_dict(self) -> Dict[str, Any]:
         result = asdict(self)
+        for name in _DERIVED_FEATURE_FIELDS:
+            del result[name]
         result['categories'] = [c.value for c in self.categories]
-        result['complexity'] = self.complexity.value
+        result['complexity'] = self.complexity.label
         result['languages'] = [l.value for l in self.languages]
         result['frameworks'] = [f.value for f in self.frameworks]
         return result
 
 
+# Category keywords
+_CATEGORY_PATTERNS: Mapping[TaskCategory, Tuple[str, ...]] = MappingProxyType({
+    TaskCategory.DEVELOPMENT: (
+        'implement', 'create', 'build', 'develop', 'add', 'feature',
+        'functionality', 'component', 'module', 'service', 'endpoint'
+    ),
+    TaskCategory.TESTING: (
+        'test', 'testing', 'unit test', 'integration test', 'coverage',
+        'spec', 'pytest', 'jest', 'mocha', 'assert', 'verify'
+    ),
+    TaskCategory.DEBUGGING: (
+        'debug', 'fix', 'bug', 'error', 'issue', 'problem', 'crash',
+        'exception', 'failing', 'broken', 'not working', 'investigate'
+    ),
+    TaskCategory.REFACTORING: (
+        'refactor', 'optimize', 'improve', 'clean up', 'reorganize',
+        'restructure', 'simplify', 'extract', 'rename', 'move'
+    ),
+    TaskCategory.ARCHITECTURE: (
+        'architecture', 'design', 'structure', 'pattern', 'system',
+        'scalability', 'microservice', 'monolith', 'distributed'
+    ),
+    TaskCategory.DATA_ANALYSIS: (
+        'analyze', 'data', 'statistics', 'metrics', 'report', 'visualization',
+        'pandas', 'numpy', 'matplotlib', 'dashboard', 'insights'
+    ),
+    TaskCategory.RESEARCH: (
+        'research', 'investigate', 'explore', 'find', 'search', 'understand',
+        'learn', 'study', 'compare', 'evaluate', 'assess'
+    ),
+    TaskCategory.DEPLOYMENT: (
+        'deploy', 'deployment', 'release', 'production', 'staging',
+        'ci/cd', 'pipeline', 'docker', 'kubernetes', 'aws', 'azure'
+    ),
+    TaskCategory.DOCUMENTATION: (
+        'document', 'documentation', 'readme', 'docs', 'comment',
+        'explain', 'describe', 'guide', 'tutorial', 'api docs'
+    ),
+    TaskCategory.SECURITY: (
+        'security', 'vulnerability', 'authentication', 'authorization',
+        'encryption', 'csrf', 'xss', 'sql injection', 'owasp', 'audit'
+    ),
+    TaskCategory.PERFORMANCE: (
+        'performance', 'optimization', 'speed', 'faster', 'slow',
+        'latency', 'throughput', 'memory', 'cpu', 'profiling'
+    ),
+    TaskCategory.UI_UX: (
+        'ui', 'ux', 'interface', 'design', 'layout', 'style', 'css',
+        'responsive', 'accessibility', 'user experience', 'frontend'
+    ),
+    TaskCategory.API_DESIGN: (
+        'api', 'endpoint', 'rest', 'graphql', 'grpc', 'swagger',
+        'openapi', 'schema', 'route', 'controller', 'webhook'
+    ),
+    TaskCategory.DATABASE: (
+        'database', 'sql', 'query', 'migration', 'schema', 'table',
+        'index', 'postgres', 'mysql', 'mongodb', 'redis', 'orm'
+    ),
+    TaskCategory.REVIEW: (
+        'review', 'code review', 'pr review', 'check', 'validate',
+        'approve', 'feedback', 'suggestion', 'quality', 'standards'
+    )
+})
+
+# Language patterns
+_LANGUAGE_PATTERNS: Mapping[ProgrammingLanguage, Tuple[str, ...]] = MappingProxyType({
+    ProgrammingLanguage.PYTHON: (
+        '.py', 'python', 'django', 'flask', 'fastapi', 'pandas', 'numpy',
+        'pip', 'pytest', 'pyenv', 'poetry', '__init__', 'def ', 'import '
+    ),
+    ProgrammingLanguage.JAVASCRIPT: (
+        '.js', 'javascript', 'node', 'npm', 'express', 'react', 'vue',
+        'angular', 'webpack', 'babel', 'eslint', 'const ', 'let ', 'var '
+    ),
+    ProgrammingLanguage.TYPESCRIPT: (
+        '.ts', '.tsx', 'typescript', 'interface', 'type', 'enum',
+        'tsc', 'tsconfig', 'nextjs', ': string', ': number', ': boolean'
+    ),
+    ProgrammingLanguage.JAVA: (
+        '.java', 'java', 'spring', 'maven', 'gradle', 'junit',
+        'public class', 'private', 'protected', 'extends', 'implements'
+    ),
+    ProgrammingLanguage.GO: (
+        '.go', 'golang', 'go mod', 'package main', 'func', 'goroutine',
+        'channel', 'defer', 'fmt.', 'gin', 'echo'
+    ),
+    ProgrammingLanguage.RUST: (
+        '.rs', 'rust', 'cargo', 'rustc', 'fn ', 'let ', 'mut ', 'struct ',
+        'impl ', 'trait ', 'enum ', 'match ', 'Result<', 'Option<', 
+        'Vec<', 'String', 'Box<', 'Arc<', 'Mutex<', 'async fn', 'await',
+        'tokio', 'serde', 'clap', '&str', 'unsafe ', 'lifetime', 'borrow'
+    ),
+    ProgrammingLanguage.SQL: (
+        '.sql', 'select', 'insert', 'update', 'delete', 'join',
+        'where', 'group by', 'order by', 'create table', 'alter'
+    )
+})
+
+# Framework patterns
+_FRAMEWORK_PATTERNS: Mapping[Framework, Tuple[str, ...]] = MappingProxyType({
+    Framework.REACT: ('react', 'jsx', 'usestate', 'useeffect', 'component'),
+    Framework.NEXTJS: ('next.js', 'nextjs', 'getserversideprops', 'app router'),
+    Framework.DJANGO: ('django', 'models.py', 'views.py', 'urls.py', 'manage.py'),
+    Framework.FASTAPI: ('fastapi', 'pydantic', 'uvicorn', '@app.'),
+    Framework.DOCKER: ('docker', 'dockerfile', 'docker-compose', 'container'),
+    Framework.KUBERNETES: ('kubernetes', 'k8s', 'kubectl', 'pod', 'deployment'),
+    Framework.POSTGRES: ('postgres', 'postgresql', 'psql', 'pg_'),
+    Framework.MONGODB: ('mongodb', 'mongoose', 'collection', 'document')
+})
+
+# Rust-specific patterns (can be expanded to full Framework enum later)
+_RUST_FRAMEWORKS = (
+    'tokio', 'async-std', 'serde', 'clap', 'rocket', 'axum', 'warp',
+    'diesel', 'sqlx', 'reqwest', 'hyper', 'tonic', 'wasm-bindgen',
+    'yew', 'bevy', 'actix-web', 'tauri', 'crossbeam', 'rayon'
+)
+
+# Complexity indicators
+_COMPLEXITY_INDICATORS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    'trivial': ('simple', 'basic', 'quick', 'minor', 'small', 'typo'),
+    'simple': ('straightforward', 'easy', 'single', 'one'),
+    'moderate': ('several', 'multiple', 'some', 'few'),
+    'complex': ('complex', 'complicated', 'many', 'large', 'significant'),
+    'very_complex': ('entire', 'system', 'architecture', 'redesign', 'major')
+})
+
+# Complexity levels in the order their indicators are checked
+_COMPLEXITY_LEVELS = tuple(TaskComplexity[level.upper()] for level in _COMPLEXITY_INDICATORS)
+
+# One scanner over every category, language, framework, characteristic and
+# complexity keyword
+_KEYWORD_SCANNER, _KEYWORD_TAGS = _compile_keyword_scanner({
+    **_CATEGORY_PATTERNS, **_LANGUAGE_PATTERNS,
+    **_FRAMEWORK_PATTERNS, **_CHARACTERISTIC_KEYWORDS,
+    **dict(zip(_COMPLEXITY_LEVELS, _COMPLEXITY_INDICATORS.values()))
+})
+
+
+# TaskFeatures fields computed from the others rather than passed in
+_DERIVED_FEATURE_FIELDS = tuple(f.name for f in fields(TaskFeatures) if not f.init)
+
+
 class TaskClassifier:
     """Classifies tasks to determine required agents and workflow"""
     
@@ -144,137 +435,34 @@ class TaskClassifier:
         # Load classification patterns
         self._load_patterns()
         
-        # Task history for learning
-        self.task_history: List[Tuple[str, TaskFeatures]] = []
+        # Classification depends only on the description and file list, so
+        # repeated tasks share one result
+        self._classify_cached = lru_cache(maxsize=self.config.get('cache_size', 4096))(
+            self._classify_uncached)
+        
+        # Task history for learning, capped to the most recent tasks
+        self.task_history: Deque[Tuple[str, TaskFeatures]] = deque(
+            maxlen=self.config.get('history_size', 10_000))
+        
+        # Running totals over the retained history for get_statistics
+        self._category_counts: Counter = Counter()
+        self._complexity_counts: Counter = Counter()
+        self._language_counts: Counter = Counter()
+        self._confidence_total = 0.0
     
     def _load_patterns(self):
         """Load classification patterns"""
         
-        # Category keywords
-        self.category_patterns = {
-            TaskCategory.DEVELOPMENT: [
-                'implement', 'create', 'build', 'develop', 'add', 'feature',
-                'functionality', 'component', 'module', 'service', 'endpoint'
-            ],
-            TaskCategory.TESTING: [
-                'test', 'testing', 'unit test', 'integration test', 'coverage',
-                'spec', 'pytest', 'jest', 'mocha', 'assert', 'verify'
-            ],
-            TaskCategory.DEBUGGING: [
-                'debug', 'fix', 'bug', 'error', 'issue', 'problem', 'crash',
-                'exception', 'failing', 'broken', 'not working', 'investigate'
-            ],
-            TaskCategory.REFACTORING: [
-                'refactor', 'optimize', 'improve', 'clean up', 'reorganize',
-                'restructure', 'simplify', 'extract', 'rename', 'move'
-            ],
-            TaskCategory.ARCHITECTURE: [
-                'architecture', 'design', 'structure', 'pattern', 'system',
-                'scalability', 'microservice', 'monolith', 'distributed'
-            ],
-            TaskCategory.DATA_ANALYSIS: [
-                'analyze', 'data', 'statistics', 'metrics', 'report', 'visualization',
-                'pandas', 'numpy', 'matplotlib', 'dashboard', 'insights'
-            ],
-            TaskCategory.RESEARCH: [
-                'research', 'investigate', 'explore', 'find', 'search', 'understand',
-                'learn', 'study', 'compare', 'evaluate', 'assess'
-            ],
-            TaskCategory.DEPLOYMENT: [
-                'deploy', 'deployment', 'release', 'production', 'staging',
-                'ci/cd', 'pipeline', 'docker', 'kubernetes', 'aws', 'azure'
-            ],
-            TaskCategory.DOCUMENTATION: [
-                'document', 'documentation', 'readme', 'docs', 'comment',
-                'explain', 'describe', 'guide', 'tutorial', 'api docs'
-            ],
-            TaskCategory.SECURITY: [
-                'security', 'vulnerability', 'authentication', 'authorization',
-                'encryption', 'csrf', 'xss', 'sql injection', 'owasp', 'audit'
-            ],
-            TaskCategory.PERFORMANCE: [
-                'performance', 'optimization', 'speed', 'faster', 'slow',
-                'latency', 'throughput', 'memory', 'cpu', 'profiling'
-            ],
-            TaskCategory.UI_UX: [
-                'ui', 'ux', 'interface', 'design', 'layout', 'style', 'css',
-                'responsive', 'accessibility', 'user experience', 'frontend'
-            ],
-            TaskCategory.API_DESIGN: [
-                'api', 'endpoint', 'rest', 'graphql', 'grpc', 'swagger',
-                'openapi', 'schema', 'route', 'controller', 'webhook'
-            ],
-            TaskCategory.DATABASE: [
-                'database', 'sql', 'query', 'migration', 'schema', 'table',
-                'index', 'postgres', 'mysql', 'mongodb', 'redis', 'orm'
-            ],
-            TaskCategory.REVIEW: [
-                'review', 'code review', 'pr review', 'check', 'validate',
-                'approve', 'feedback', 'suggestion', 'quality', 'standards'
-            ]
-        }
-        
-        # Language patterns
-        self.language_patterns = {
-            ProgrammingLanguage.PYTHON: [
-                '.py', 'python', 'django', 'flask', 'fastapi', 'pandas', 'numpy',
-                'pip', 'pytest', 'pyenv', 'poetry', '__init__', 'def ', 'import '
-            ],
-            ProgrammingLanguage.JAVASCRIPT: [
-                '.js', 'javascript', 'node', 'npm', 'express', 'react', 'vue',
-                'angular', 'webpack', 'babel', 'eslint', 'const ', 'let ', 'var '
-            ],
-            ProgrammingLanguage.TYPESCRIPT: [
-                '.ts', '.tsx', 'typescript', 'interface', 'type', 'enum',
-                'tsc', 'tsconfig', 'nextjs', ': string', ': number', ': boolean'
-            ],
-            ProgrammingLanguage.JAVA: [
-                '.java', 'java', 'spring', 'maven', 'gradle', 'junit',
-                'public class', 'private', 'protected', 'extends', 'implements'
-            ],
-            ProgrammingLanguage.GO: [
-                '.go', 'golang', 'go mod', 'package main', 'func', 'goroutine',
-                'channel', 'defer', 'fmt.', 'gin', 'echo'
-            ],
-            ProgrammingLanguage.RUST: [
-                '.rs', 'rust', 'cargo', 'rustc', 'fn ', 'let ', 'mut ', 'struct ',
-                'impl ', 'trait ', 'enum ', 'match ', 'Result<', 'Option<', 
-                'Vec<', 'String', 'Box<', 'Arc<', 'Mutex<', 'async fn', 'await',
-                'tokio', 'serde', 'clap', '&str', 'unsafe ', 'lifetime', 'borrow'
-            ],
-            ProgrammingLanguage.SQL: [
-                '.sql', 'select', 'insert', 'update', 'delete', 'join',
-                'where', 'group by', 'order by', 'create table', 'alter'
-            ]
-        }
-        
-        # Framework patterns
-        self.framework_patterns = {
-            Framework.REACT: ['react', 'jsx', 'usestate', 'useeffect', 'component'],
-            Framework.NEXTJS: ['next.js', 'nextjs', 'getserversideprops', 'app router'],
-            Framework.DJANGO: ['django', 'models.py', 'views.py', 'urls.py', 'manage.py'],
-            Framework.FASTAPI: ['fastapi', 'pydantic', 'uvicorn', '@app.'],
-            Framework.DOCKER: ['docker', 'dockerfile', 'docker-compose', 'container'],
-            Framework.KUBERNETES: ['kubernetes', 'k8s', 'kubectl', 'pod', 'deployment'],
-            Framework.POSTGRES: ['postgres', 'postgresql', 'psql', 'pg_'],
-            Framework.MONGODB: ['mongodb', 'mongoose', 'collection', 'document']
-        }
-        
-        # Rust-specific patterns (can be expanded to full Framework enum later)
-        self.rust_frameworks = [
-            'tokio', 'async-std', 'serde', 'clap', 'rocket', 'axum', 'warp',
-            'diesel', 'sqlx', 'reqwest', 'hyper', 'tonic', 'wasm-bindgen',
-            'yew', 'bevy', 'actix-web', 'tauri', 'crossbeam', 'rayon'
-        ]
-        
-        # Complexity indicators
-        self.complexity_indicators = {
-            'trivial': ['simple', 'basic', 'quick', 'minor', 'small', 'typo'],
-            'simple': ['straightforward', 'easy', 'single', 'one'],
-            'moderate': ['several', 'multiple', 'some', 'few'],
-            'complex': ['complex', 'complicated', 'many', 'large', 'significant'],
-            'very_complex': ['entire', 'system', 'architecture', 'redesign', 'major']
-        }
+        # The keyword tables and the scanner compiled from them are built once
+        # at import and shared by every classifier
+        self.category_patterns = _CATEGORY_PATTERNS
+        self.language_patterns = _LANGUAGE_PATTERNS
+        self.framework_patterns = _FRAMEWORK_PATTERNS
+        self.rust_frameworks = _RUST_FRAMEWORKS
+        self.complexity_indicators = _COMPLEXITY_INDICATORS
+        self._complexity_levels = _COMPLEXITY_LEVELS
+        self._keyword_scanner = _KEYWORD_SCANNER
+        self._keyword_tags = _KEYWORD_TAGS
     
     def classify_task(self, task_description: str, context: Optional[Dict[str, Any]] = None) -> TaskFeatures:
         """
@@ -285,56 +473,76 @@ class TaskClassifier:
             context: Additional context (files, current state, etc.)
         
         Returns:
-            TaskFeatures object with classification results
+            TaskFeatures object with classification results; repeated tasks
+            share the same object, so treat it as read-only
         """
         
+        # Only the file list in the context affects classification
+        files = tuple(context['files']) if context and 'files' in context else None
+        features = self._classify_cached(task_description, files)
+        
+        # Add to history for learning, retiring the oldest entry once full
+        history = self.task_history
+        if history.maxlen is not None and len(history) == history.maxlen:
+            self._count_task(history[0][1], -1)
+        history.append((task_description, features))
+        self._count_task(features, 1)
+        
+        self.logger.debug("Task classified: %s, complexity: %s",
+                          features.categories, features.complexity.label)
+        
+        return features
+    
+    def _classify_uncached(self, task_description: str, files: Optional[Tuple[str, ...]]) -> TaskFeatures:
+        """Classify a task from its description and context file list"""
+        context = {'files': files} if files is not None else None
+        
         # Normalize text for analysis
         text_lower = task_description.lower()
         
+        # Tags of every keyword in the text, from a single scan; enum members
+        # for categories, languages and frameworks, group names for the
+        # characteristic keywords, complexity levels for the indicators
+        tags = self._scan_keywords(text_lower)
+        
         # Extract categories
-        categories = self._extract_categories(text_lower)
+        categories = self._extract_categories(tags)
         
         # Determine complexity
-        complexity = self._determine_complexity(text_lower, context)
+        complexity = self._determine_complexity(tags, text_lower, context)
         
         # Extract languages
-        languages = self._extract_languages(text_lower, context)
+        languages = self._extract_languages(tags, context)
         
         # Extract frameworks
-        frameworks = self._extract_frameworks(text_lower, context)
+        frameworks = self._extract_frameworks(tags, context)
         
         # Extract keywords
-        keywords = self._extract_keywords(task_description)
+        keywords = self._extract_keywords(text_lower)
         
         # Extract file patterns
         file_patterns = self._extract_file_patterns(task_description, context)
         
         # Determine task characteristics
-        requires_testing = self._requires_testing(text_lower, categories)
-        requires_review = self._requires_review(text_lower, complexity)
+        requires_testing = self._requires_testing(tags, categories)
+        requires_review = self._requires_review(tags, complexity)
         requires_deployment = TaskCategory.DEPLOYMENT in categories
-        requires_documentation = self._requires_documentation(text_lower, categories)
+        requires_documentation = self._requires_documentation(tags, categories)
         
         # Determine task type
-        is_bug_fix = TaskCategory.DEBUGGING in categories or 'fix' in text_lower
-        is_new_feature = TaskCategory.DEVELOPMENT in categories and 'new' in text_lower
+        is_bug_fix = TaskCategory.DEBUGGING in categories or 'fix' in tags
+        is_new_feature = TaskCategory.DEVELOPMENT in categories and 'new' in tags
         is_refactoring = TaskCategory.REFACTORING in categories
         is_research = TaskCategory.RESEARCH in categories
         
         # Estimate scope
-        estimated_files = self._estimate_file_count(text_lower, complexity)
+        estimated_files = self._estimate_file_count(complexity)
         
         # Check for specific components
-        has_database = TaskCategory.DATABASE in categories or any(
-            keyword in text_lower for keyword in ['database', 'sql', 'query', 'table']
-        )
-        has_api = TaskCategory.API_DESIGN in categories or 'api' in text_lower
-        has_ui = TaskCategory.UI_UX in categories or any(
-            keyword in text_lower for keyword in ['ui', 'frontend', 'interface', 'component']
-        )
-        has_security_implications = TaskCategory.SECURITY in categories or any(
-            keyword in text_lower for keyword in ['security', 'auth', 'permission', 'sensitive']
-        )
+        has_database = TaskCategory.DATABASE in categories or 'database' in tags
+        has_api = TaskCategory.API_DESIGN in categories or 'api' in tags
+        has_ui = TaskCategory.UI_UX in categories or 'ui' in tags
+        has_security_implications = TaskCategory.SECURITY in categories or 'security' in tags
         
         # Calculate confidence
         confidence = self._calculate_confidence(categories, languages, frameworks)
@@ -363,20 +571,35 @@ class TaskClassifier:
             confidence=confidence
         )
         
-        # Add to history for learning
-        self.task_history.append((task_description, features))
-        
-        self.logger.info(f"Task classified: {categories}, complexity: {complexity.value}")
-        
         return features
     
-    def _extract_categories(self, text: str) -> List[TaskCategory]:
-        """Extract task categories from text"""
-        categories = []
+    def classify_batch(self,
+                       task_descriptions: List[str],
+                       context: Optional[Dict[str, Any]] = None) -> List[TaskFeatures]:
+        """
+        Classify several tasks
+        
+        Args:
+            task_descriptions: Natural language descriptions of the tasks
+            context: Additional context shared by all tasks
         
-        for category, keywords in self.category_patterns.items():
-            if any(keyword in text for keyword in keywords):
-                categories.append(category)
+        Returns:
+            One TaskFeatures object per task, in input order
+        """
+        classify_task = self.classify_task
+        return [classify_task(task_description, context) for task_description in task_descriptions]
+    
+    def _scan_keywords(self, text: str) -> Set[Any]:
+        """Categories, languages, frameworks and keyword groups occurring in text"""
+        keyword_tags = self._keyword_tags
+        tags = set()
+        for keyword in set(self._keyword_scanner.findall(text)):
+            tags |= keyword_tags[keyword]
+        return tags
+    
+    def _extract_categories(self, tags: Set[Any]) -> List[TaskCategory]:
+        """Extract task categories from scanned keyword tags"""
+        categories = [category for category in self.category_patterns if category in tags]
         
         # Default to development if no category found
         if not categories:
@@ -384,22 +607,16 @@ class TaskClassifier:
         
         return categories
     
-    def _determine_complexity(self, text: str, context: Optional[Dict[str, Any]]) -> TaskComplexity:
+    def _determine_complexity(self,
+                              tags: Set[Any],
+                              text: str,
+                              context: Optional[Dict[str, Any]]) -> TaskComplexity:
         """Determine task complexity"""
         
-        # Check for explicit complexity indicators
-        for level, indicators in self.complexity_indicators.items():
-            if any(indicator in text for indicator in indicators):
-                if level == 'trivial':
-                    return TaskComplexity.TRIVIAL
-                elif level == 'simple':
-                    return TaskComplexity.SIMPLE
-                elif level == 'moderate':
-                    return TaskComplexity.MODERATE
-                elif level == 'complex':
-                    return TaskComplexity.COMPLEX
-                elif level == 'very_complex':
-                    return TaskComplexity.VERY_COMPLEX
+        # Check for explicit complexity indicators, lowest level first
+        for level in self._complexity_levels:
+            if level in tags:
+                return level
         
         # Check context for file count
         if context and 'files' in context:
@@ -422,75 +639,44 @@ class TaskClassifier:
         else:
             return TaskComplexity.COMPLEX
     
-    def _extract_languages(self, text: str, context: Optional[Dict[str, Any]]) -> List[ProgrammingLanguage]:
+    def _extract_languages(self, tags: Set[Any], context: Optional[Dict[str, Any]]) -> List[ProgrammingLanguage]:
         """Extract programming languages"""
-        languages = []
         
-        # Check text for language patterns
-        for language, patterns in self.language_patterns.items():
-            if any(pattern in text for pattern in patterns):
-                languages.append(language)
+        # Languages whose patterns were found in the text
+        languages = [language for language in self.language_patterns if language in tags]
         
         # Check context for file extensions
         if context and 'files' in context:
+            seen = set(languages)
             for file in context['files']:
-                ext = Path(file).suffix.lower()
-                if ext == '.py':
-                    if ProgrammingLanguage.PYTHON not in languages:
-                        languages.append(ProgrammingLanguage.PYTHON)
-                elif ext in ['.js', '.jsx']:
-                    if ProgrammingLanguage.JAVASCRIPT not in languages:
-                        languages.append(ProgrammingLanguage.JAVASCRIPT)
-                elif ext in ['.ts', '.tsx']:
-                    if ProgrammingLanguage.TYPESCRIPT not in languages:
-                        languages.append(ProgrammingLanguage.TYPESCRIPT)
-                elif ext == '.rs':
-                    if ProgrammingLanguage.RUST not in languages:
-                        languages.append(ProgrammingLanguage.RUST)
+                language = _EXTENSION_LANGUAGES.get(_file_suffix(file))
+                if language is not None and language not in seen:
+                    seen.add(language)
+                    languages.append(language)
         
         return languages
     
-    def _extract_frameworks(self, text: str, context: Optional[Dict[str, Any]]) -> List[Framework]:
+    def _extract_frameworks(self, tags: Set[Any], context: Optional[Dict[str, Any]]) -> List[Framework]:
         """Extract frameworks and libraries"""
-        frameworks = []
-        
-        for framework, patterns in self.framework_patterns.items():
-            if any(pattern in text for pattern in patterns):
-                frameworks.append(framework)
-        
-        return frameworks
+        return [framework for framework in self.framework_patterns if framework in tags]
     
-    def _extract_keywords(self, text: str) -> List[str]:
+    def _extract_keywords(self, text_lower: str) -> List[str]:
         """Extract important keywords"""
         # Simple keyword extraction - can be enhanced with NLP
-        import re
         
-        # Remove common words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-                     'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be'}
+        # Extract words, dropping common and very short ones
+        words = (word for word in _WORD_RE.findall(text_lower)
+                 if len(word) > 2 and word not in _STOP_WORDS)
         
-        # Extract words
-        words = re.findall(r'\b[a-z]+\b', text.lower())
-        
-        # Filter and count
-        word_freq = {}
-        for word in words:
-            if word not in stop_words and len(word) > 2:
-                word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Return top keywords
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, _ in sorted_words[:10]]
+        # Return top keywords; ties keep first-seen order
+        return [word for word, _ in Counter(words).most_common(10)]
     
     def _extract_file_patterns(self, text: str, context: Optional[Dict[str, Any]]) -> List[str]:
         """Extract file patterns mentioned in task"""
         patterns = []
         
         # Look for file extensions
-        import re
-        ext_pattern = r'\.\w{2,4}\b'
-        extensions = re.findall(ext_pattern, text)
-        patterns.extend(extensions)
+        patterns.extend(_EXT_RE.findall(text))
         
         # Look for directory patterns
         dir_patterns = ['src/', 'test/', 'tests/', 'lib/', 'components/', 'utils/']
@@ -500,12 +686,12 @@ class TaskClassifier:
         
         return patterns
     
-    def _requires_testing(self, text: str, categories: List[TaskCategory]) -> bool:
+    def _requires_testing(self, tags: Set[Any], categories: List[TaskCategory]) -> bool:
         """Determine if task requires testing"""
         if TaskCategory.TESTING in categories:
             return True
         
-        if any(keyword in text for keyword in ['test', 'testing', 'coverage', 'spec']):
+        if 'testing' in tags:
             return True
         
         # New features and bug fixes should have tests
@@ -514,9 +700,9 @@ class TaskClassifier:
         
         return False
     
-    def _requires_review(self, text: str, complexity: TaskComplexity) -> bool:
+    def _requires_review(self, tags: Set[Any], complexity: TaskComplexity) -> bool:
         """Determine if task requires review"""
-        if 'review' in text:
+        if 'review' in tags:
             return True
         
         # Complex tasks should be reviewed
@@ -525,12 +711,12 @@ class TaskClassifier:
         
         return False
     
-    def _requires_documentation(self, text: str, categories: List[TaskCategory]) -> bool:
+    def _requires_documentation(self, tags: Set[Any], categories: List[TaskCategory]) -> bool:
         """Determine if task requires documentation"""
         if TaskCategory.DOCUMENTATION in categories:
             return True
         
-        if any(keyword in text for keyword in ['document', 'docs', 'readme', 'comment']):
+        if 'documentation' in tags:
             return True
         
         # New features and APIs need documentation
@@ -539,18 +725,9 @@ class TaskClassifier:
         
         return False
     
-    def _estimate_file_count(self, text: str, complexity: TaskComplexity) -> int:
+    def _estimate_file_count(self, complexity: TaskComplexity) -> int:
         """Estimate number of files affected"""
-        if complexity == TaskComplexity.TRIVIAL:
-            return 1
-        elif complexity == TaskComplexity.SIMPLE:
-            return 2
-        elif complexity == TaskComplexity.MODERATE:
-            return 5
-        elif complexity == TaskComplexity.COMPLEX:
-            return 10
-        else:  # VERY_COMPLEX
-            return 20
+        return _FILES_PER_COMPLEXITY[complexity]
     
     def _calculate_confidence(self, 
                             categories: List[TaskCategory],
@@ -571,40 +748,31 @@ class TaskClassifier:
         # Cap at 1.0
         return min(confidence, 1.0)
     
+    def _count_task(self, features: TaskFeatures, sign: int):
+        """Add (sign=1) or remove (sign=-1) a task from the running totals"""
+        
+        for category in features.categories:
+            self._category_counts[category.value] += sign
+        self._complexity_counts[features.complexity.label] += sign
+        for language in features.languages:
+            self._language_counts[language.value] += sign
+        self._confidence_total += sign * features.confidence
+        
+        if sign < 0:
+            # Drop keys that fell out of the retained history
+            self._category_counts += Counter()
+            self._complexity_counts += Counter()
+            self._language_counts += Counter()
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get classification statistics"""
         if not self.task_history:
             return {}
         
-        stats = {
+        return {
             'total_tasks': len(self.task_history),
-            'category_distribution': {},
-            'complexity_distribution': {},
-            'language_distribution': {},
-            'average_confidence': 0
+            'category_distribution': dict(self._category_counts),
+            'complexity_distribution': dict(self._complexity_counts),
+            'language_distribution': dict(self._language_counts),
+            'average_confidence': self._confidence_total / len(self.task_history)
         }
-        
-        for _, features in self.task_history:
-            # Categories
-            for category in features.categories:
-                cat_name = category.value
-                stats['category_distribution'][cat_name] = \
-                    stats['category_distribution'].get(cat_name, 0) + 1
-            
-            # Complexity
-            comp_name = features.complexity.value
-            stats['complexity_distribution'][comp_name] = \
-                stats['complexity_distribution'].get(comp_name, 0) + 1
-            
-            # Languages
-            for language in features.languages:
-                lang_name = language.value
-                stats['language_distribution'][lang_name] = \
-                    stats['language_distribution'].get(lang_name, 0) + 1
-            
-            # Confidence
-            stats['average_confidence'] += features.confidence
-        
-        stats['average_confidence'] /= len(self.task_history)
-        
-        return stats
\ No newline at end of file
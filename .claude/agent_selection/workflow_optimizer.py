@@ -3,20 +3,19 @@ Workflow optimization for selected agent teams
 """
 
 import json
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, Iterator, Mapping, NamedTuple, Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
+from types import MappingProxyType
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from .agent_selector import TeamComposition
+from .task_classifier import TaskFeatures, TaskComplexity
 
-from agent_selection.agent_selector import TeamComposition
-from agent_selection.task_classifier import TaskFeatures, TaskComplexity
 
-
-@dataclass
+@dataclass(slots=True)
 class WorkflowStage:
     """Represents a stage in the workflow"""
     stage_id: str
@@ -39,7 +38,7 @@ class WorkflowStage:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class OptimizedWorkflow:
     """Optimized workflow for task execution"""
     workflow_id: str
@@ -51,10 +50,13 @@ class OptimizedWorkflow:
     description: str
     
     def to_dict(self) -> Dict[str, Any]:
+        return self._as_dict([stage.to_dict() for stage in self.stages])
+    
+    def _as_dict(self, stages: List[Any]) -> Dict[str, Any]:
         return {
             'id': self.workflow_id,
             'type': self.workflow_type,
-            'stages': [stage.to_dict() for stage in self.stages],
+            'stages': stages,
             'metadata': {
                 'total_agents': self.total_agents,
                 'estimated_time': self.estimated_time,
@@ -65,7 +67,133 @@ class OptimizedWorkflow:
     
     def to_json(self) -> str:
         """Convert workflow to JSON"""
-        return json.dumps(self.to_dict(), indent=2)
+        return json.dumps(self, cls=_WorkflowEncoder, indent=2)
+
+
+class _WorkflowEncoder(json.JSONEncoder):
+    """Serializes workflows stage by stage, without building the nested dict first"""
+    
+    def default(self, o: Any) -> Any:
+        if isinstance(o, WorkflowStage):
+            return o.to_dict()
+        if isinstance(o, OptimizedWorkflow):
+            return o._as_dict(o.stages)
+        return super().default(o)
+
+
+class _StageProto(NamedTuple):
+    """Static part of a workflow stage; agents, timeout and dependencies vary per team"""
+    stage_id: str
+    name: str
+    outputs: Tuple[str, ...] = ()
+
+    def build(self,
+              agents: List[str],
+              parallel: bool = False,
+              timeout: Optional[int] = None,
+              dependencies: Sequence[str] = (),
+              stage_id: Optional[str] = None) -> WorkflowStage:
+        return WorkflowStage(
+            stage_id=stage_id or self.stage_id,
+            name=self.name,
+            agents=agents,
+            parallel=parallel,
+            timeout=timeout,
+            dependencies=list(dependencies),
+            outputs=list(self.outputs)
+        )
+
+
+# Stage descriptors per workflow type, compiled once at import. Numbered
+# stages (sequential and team-orchestration) get their id when built.
+_COMPILED_TEMPLATES: Mapping[str, Mapping[str, _StageProto]] = MappingProxyType({
+    'single-agent': MappingProxyType({
+        'execute': _StageProto('execute', 'Execute Task'),
+        'review': _StageProto('review', 'Review'),
+    }),
+    'sequential-collaboration': MappingProxyType({
+        'analysis': _StageProto('', 'Analysis'),
+        'testing': _StageProto('', 'Testing'),
+        'review': _StageProto('', 'Review'),
+    }),
+    'parallel-collaboration': MappingProxyType({
+        'parallel_execute': _StageProto('parallel_execute', 'Parallel Execution'),
+        'integrate': _StageProto('integrate', 'Integration'),
+        'execute': _StageProto('execute', 'Execute'),
+        'parallel_test': _StageProto('parallel_test', 'Parallel Testing'),
+        'test': _StageProto('test', 'Testing'),
+        'review': _StageProto('review', 'Review'),
+    }),
+    'parallel-redundant': MappingProxyType({
+        'redundant_execute': _StageProto('redundant_execute', 'Redundant Parallel Execution'),
+        'validate': _StageProto('validate', 'Validate Results', ('validation_report',)),
+        'select': _StageProto('select', 'Select Best Result', ('final_result',)),
+    }),
+    'team-orchestration': MappingProxyType({
+        'research': _StageProto('', 'Research & Analysis', ('research_findings',)),
+        'design': _StageProto('', 'Design & Architecture', ('design_spec',)),
+        'parallel_implement': _StageProto('', 'Parallel Implementation', ('implementation_modules',)),
+        'integrate': _StageProto('', 'Integration', ('integrated_solution',)),
+        'implement': _StageProto('', 'Implementation', ('implementation',)),
+        'test': _StageProto('', 'Testing & QA', ('test_results',)),
+        'document': _StageProto('', 'Documentation', ('documentation',)),
+        'review': _StageProto('', 'Final Review', ('review_report',)),
+        'deploy': _StageProto('', 'Deployment', ('deployment_status',)),
+    }),
+})
+
+# Stage timeout in seconds, indexed by TaskComplexity
+_TIMEOUT_PER_COMPLEXITY = (
+    60,    # TRIVIAL: 1 minute
+    300,   # SIMPLE: 5 minutes
+    600,   # MODERATE: 10 minutes
+    1800,  # COMPLEX: 30 minutes
+    3600,  # VERY_COMPLEX: 1 hour
+)
+
+# Stage heading and agent line of the text visualization
+_STAGE_TEMPLATE = "{prefix} {name}{parallel_marker}\n     Agents: {agents}"
+
+# Team-orchestration stages are numbered in emission order
+_ENHANCED_STAGE_IDS = tuple(
+    f'stage_{i}' for i in range(len(_COMPILED_TEMPLATES['team-orchestration']))
+)
+
+
+@lru_cache(maxsize=1024)
+def _team_fingerprint(primary: Tuple[str, ...],
+                      support: Tuple[str, ...],
+                      review: Tuple[str, ...]) -> str:
+    """Stable short digest of a team's role lists"""
+    digest = hashlib.blake2b(digest_size=5)
+    for agents in (primary, support, review):
+        for agent in agents:
+            digest.update(agent.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(b'\1')
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1024)
+def _team_roles(primary: Tuple[str, ...],
+                support: Tuple[str, ...]) -> Mapping[str, Tuple[str, ...]]:
+    """Group agents by role keyword: designers from the primary agents,
+    testers, documenters and deployers from the support agents"""
+    design = tuple(a for a in primary if 'architect' in a or 'design' in a)
+    test, doc, deploy = [], [], []
+    for agent in support:
+        if 'test' in agent or 'qa' in agent:
+            test.append(agent)
+        if 'doc' in agent or 'product' in agent:
+            doc.append(agent)
+        if 'deploy' in agent:
+            deploy.append(agent)
+    return MappingProxyType({
+        'design': design,
+        'test': tuple(test),
+        'doc': tuple(doc),
+        'deploy': tuple(deploy),
+    })
 
 
 class WorkflowOptimizer:
@@ -109,6 +237,16 @@ class WorkflowOptimizer:
                 'description': 'Full team orchestration with mixed parallel/sequential'
             }
         }
+        
+        # Precompiled stage descriptors and the builder for each workflow type
+        self._compiled = _COMPILED_TEMPLATES
+        self._builders = {
+            'single-agent': self._create_single_agent_workflow,
+            'sequential-collaboration': self._create_sequential_workflow,
+            'parallel-collaboration': self._create_parallel_workflow,
+            'parallel-redundant': self._create_redundant_workflow,
+            'team-orchestration': self._create_enhanced_workflow,
+        }
     
     def optimize_workflow(self,
                          team: TeamComposition,
@@ -124,25 +262,13 @@ class WorkflowOptimizer:
             Optimized workflow
         """
         
-        workflow_type = team.workflow_suggestion
-        
-        # Generate workflow based on type
-        if workflow_type == 'single-agent':
-            workflow = self._create_single_agent_workflow(team, features)
-        elif workflow_type == 'sequential-collaboration':
-            workflow = self._create_sequential_workflow(team, features)
-        elif workflow_type == 'parallel-collaboration':
-            workflow = self._create_parallel_workflow(team, features)
-        elif workflow_type == 'parallel-redundant':
-            workflow = self._create_redundant_workflow(team, features)
-        elif workflow_type == 'team-orchestration':
-            workflow = self._create_enhanced_workflow(team, features)
-        else:
-            # Default to sequential
-            workflow = self._create_sequential_workflow(team, features)
+        # Generate workflow based on type, defaulting to sequential
+        builder = self._builders.get(team.workflow_suggestion,
+                                     self._create_sequential_workflow)
+        workflow = builder(team, features)
         
-        self.logger.info(f"Optimized workflow: {workflow.workflow_type} "
-                        f"with {len(workflow.stages)} stages")
+        self.logger.debug("Optimized workflow: %s with %d stages",
+                          workflow.workflow_type, len(workflow.stages))
         
         return workflow
     
@@ -151,30 +277,25 @@ class WorkflowOptimizer:
                                      features: TaskFeatures) -> OptimizedWorkflow:
         """Create workflow for single agent"""
         
+        protos = self._compiled['single-agent']
         stages = []
         
         # Single execution stage
         if team.primary_agents:
-            stages.append(WorkflowStage(
-                stage_id='execute',
-                name='Execute Task',
-                agents=team.primary_agents,
-                parallel=False,
+            stages.append(protos['execute'].build(
+                team.primary_agents,
                 timeout=self._calculate_timeout(features.complexity)
             ))
         
         # Optional review stage
         if team.review_agents:
-            stages.append(WorkflowStage(
-                stage_id='review',
-                name='Review',
-                agents=team.review_agents,
-                parallel=False,
-                dependencies=['execute']
+            stages.append(protos['review'].build(
+                team.review_agents,
+                dependencies=('execute',)
             ))
         
         return OptimizedWorkflow(
-            workflow_id=f"workflow_{hash(str(team))}"[:10],
+            workflow_id=self._workflow_id(team),
             workflow_type='single-agent',
             stages=stages,
             total_agents=team.total_agents,
@@ -188,20 +309,20 @@ class WorkflowOptimizer:
                                   features: TaskFeatures) -> OptimizedWorkflow:
         """Create sequential collaboration workflow"""
         
+        protos = self._compiled['sequential-collaboration']
         stages = []
         stage_count = 0
         
         # Analysis stage if research needed
         if features.is_research or features.complexity == TaskComplexity.VERY_COMPLEX:
-            stages.append(WorkflowStage(
-                stage_id=f'stage_{stage_count}',
-                name='Analysis',
-                agents=team.support_agents[:1] if team.support_agents else team.primary_agents[:1],
-                parallel=False
+            stages.append(protos['analysis'].build(
+                team.support_agents[:1] if team.support_agents else team.primary_agents[:1],
+                stage_id=f'stage_{stage_count}'
             ))
             stage_count += 1
         
         # Implementation stages (one per primary agent)
+        timeout = self._calculate_timeout(features.complexity)
         for i, agent in enumerate(team.primary_agents):
             dependencies = [f'stage_{stage_count-1}'] if stage_count > 0 else []
             
@@ -211,33 +332,29 @@ class WorkflowOptimizer:
                 agents=[agent],
                 parallel=False,
                 dependencies=dependencies,
-                timeout=self._calculate_timeout(features.complexity)
+                timeout=timeout
             ))
             stage_count += 1
         
         # Testing stage if needed
         if features.requires_testing and team.support_agents:
-            stages.append(WorkflowStage(
-                stage_id=f'stage_{stage_count}',
-                name='Testing',
-                agents=team.support_agents[:1],
-                parallel=False,
-                dependencies=[f'stage_{stage_count-1}']
+            stages.append(protos['testing'].build(
+                team.support_agents[:1],
+                dependencies=(f'stage_{stage_count-1}',),
+                stage_id=f'stage_{stage_count}'
             ))
             stage_count += 1
         
         # Review stage
         if team.review_agents:
-            stages.append(WorkflowStage(
-                stage_id=f'stage_{stage_count}',
-                name='Review',
-                agents=team.review_agents,
-                parallel=False,
-                dependencies=[f'stage_{stage_count-1}']
+            stages.append(protos['review'].build(
+                team.review_agents,
+                dependencies=(f'stage_{stage_count-1}',),
+                stage_id=f'stage_{stage_count}'
             ))
         
         return OptimizedWorkflow(
-            workflow_id=f"workflow_{hash(str(team))}"[:10],
+            workflow_id=self._workflow_id(team),
             workflow_type='sequential-collaboration',
             stages=stages,
             total_agents=team.total_agents,
@@ -251,62 +368,47 @@ class WorkflowOptimizer:
                                 features: TaskFeatures) -> OptimizedWorkflow:
         """Create parallel collaboration workflow"""
         
+        protos = self._compiled['parallel-collaboration']
         stages = []
         
         # Parallel execution stage
         if len(team.primary_agents) > 1:
-            stages.append(WorkflowStage(
-                stage_id='parallel_execute',
-                name='Parallel Execution',
-                agents=team.primary_agents,
+            stages.append(protos['parallel_execute'].build(
+                team.primary_agents,
                 parallel=True,
                 timeout=self._calculate_timeout(features.complexity)
             ))
             
             # Merge/integration stage
-            stages.append(WorkflowStage(
-                stage_id='integrate',
-                name='Integration',
-                agents=[team.primary_agents[0]],  # First agent coordinates
-                parallel=False,
-                dependencies=['parallel_execute']
+            stages.append(protos['integrate'].build(
+                [team.primary_agents[0]],  # First agent coordinates
+                dependencies=('parallel_execute',)
             ))
         else:
             # Fall back to sequential if only one agent
-            stages.append(WorkflowStage(
-                stage_id='execute',
-                name='Execute',
-                agents=team.primary_agents,
-                parallel=False
-            ))
+            stages.append(protos['execute'].build(team.primary_agents))
         
         # Testing in parallel if multiple testers
         if features.requires_testing and team.support_agents:
+            dependencies = ('integrate' if len(stages) > 1 else 'execute',)
             if len(team.support_agents) > 1:
-                stages.append(WorkflowStage(
-                    stage_id='parallel_test',
-                    name='Parallel Testing',
-                    agents=team.support_agents,
+                stages.append(protos['parallel_test'].build(
+                    team.support_agents,
                     parallel=True,
-                    dependencies=['integrate' if len(stages) > 1 else 'execute']
+                    dependencies=dependencies
                 ))
             else:
-                stages.append(WorkflowStage(
-                    stage_id='test',
-                    name='Testing',
-                    agents=team.support_agents,
-                    parallel=False,
-                    dependencies=['integrate' if len(stages) > 1 else 'execute']
+                stages.append(protos['test'].build(
+                    team.support_agents,
+                    dependencies=dependencies
                 ))
         
         # Review stage
         if team.review_agents:
-            stages.append(WorkflowStage(
-                stage_id='review',
-                name='Review',
-                agents=team.review_agents,
+            stages.append(protos['review'].build(
+                team.review_agents,
                 parallel=len(team.review_agents) > 1,
-                dependencies=[stages[-1].stage_id]
+                dependencies=(stages[-1].stage_id,)
             ))
         
         # Calculate parallelization factor
@@ -314,7 +416,7 @@ class WorkflowOptimizer:
         parallelization_factor = parallel_stages / len(stages) if stages else 0.0
         
         return OptimizedWorkflow(
-            workflow_id=f"workflow_{hash(str(team))}"[:10],
+            workflow_id=self._workflow_id(team),
             workflow_type='parallel-collaboration',
             stages=stages,
             total_agents=team.total_agents,
@@ -328,39 +430,30 @@ class WorkflowOptimizer:
                                  features: TaskFeatures) -> OptimizedWorkflow:
         """Create redundant parallel workflow"""
         
+        protos = self._compiled['parallel-redundant']
         stages = []
         
         # Parallel redundant execution
-        stages.append(WorkflowStage(
-            stage_id='redundant_execute',
-            name='Redundant Parallel Execution',
-            agents=team.primary_agents,
+        stages.append(protos['redundant_execute'].build(
+            team.primary_agents,
             parallel=True,
             timeout=self._calculate_timeout(features.complexity)
         ))
         
         # Validation stage - compare results
-        stages.append(WorkflowStage(
-            stage_id='validate',
-            name='Validate Results',
-            agents=[team.primary_agents[0]],  # First agent validates
-            parallel=False,
-            dependencies=['redundant_execute'],
-            outputs=['validation_report']
+        stages.append(protos['validate'].build(
+            [team.primary_agents[0]],  # First agent validates
+            dependencies=('redundant_execute',)
         ))
         
         # Selection stage - choose best result
-        stages.append(WorkflowStage(
-            stage_id='select',
-            name='Select Best Result',
-            agents=team.review_agents if team.review_agents else [team.primary_agents[0]],
-            parallel=False,
-            dependencies=['validate'],
-            outputs=['final_result']
+        stages.append(protos['select'].build(
+            team.review_agents if team.review_agents else [team.primary_agents[0]],
+            dependencies=('validate',)
         ))
         
         return OptimizedWorkflow(
-            workflow_id=f"workflow_{hash(str(team))}"[:10],
+            workflow_id=self._workflow_id(team),
             workflow_type='parallel-redundant',
             stages=stages,
             total_agents=team.total_agents,
@@ -374,158 +467,94 @@ class WorkflowOptimizer:
                                 features: TaskFeatures) -> OptimizedWorkflow:
         """Create enhanced team orchestration workflow"""
         
+        protos = self._compiled['team-orchestration']
+        
+        # Phases come out in execution order, so each stage depends on the
+        # one emitted before it
         stages = []
-        stage_id = 0
+        dependencies: Tuple[str, ...] = ()
+        phases = self._enhanced_phases(team, features)
+        for stage_id, (phase, agents, parallel, timeout) in zip(_ENHANCED_STAGE_IDS, phases):
+            stages.append(protos[phase].build(
+                agents,
+                parallel=parallel,
+                timeout=timeout,
+                dependencies=dependencies,
+                stage_id=stage_id
+            ))
+            dependencies = (stage_id,)
+        
+        # Calculate parallelization factor
+        parallel_stages = sum(1 for s in stages if s.parallel)
+        parallelization_factor = parallel_stages / len(stages) if stages else 0.0
+        
+        return OptimizedWorkflow(
+            workflow_id=self._workflow_id(team),
+            workflow_type='team-orchestration',
+            stages=stages,
+            total_agents=team.total_agents,
+            estimated_time=team.estimated_time * (1 - parallelization_factor * 0.25),
+            parallelization_factor=parallelization_factor,
+            description='Enhanced team orchestration with mixed parallel/sequential execution'
+        )
+    
+    def _enhanced_phases(self,
+                         team: TeamComposition,
+                         features: TaskFeatures) -> Iterator[Tuple[str, List[str], bool, Optional[int]]]:
+        """Yield (phase, agents, parallel, timeout) for each phase the task needs"""
+        
+        roles = self._roles(team)
         
         # Research phase
         if features.is_research or features.categories:
             research_agents = team.support_agents[:2] if team.support_agents else team.primary_agents[:1]
-            stages.append(WorkflowStage(
-                stage_id=f'stage_{stage_id}',
-                name='Research & Analysis',
-                agents=research_agents,
-                parallel=len(research_agents) > 1,
-                outputs=['research_findings']
-            ))
-            stage_id += 1
+            yield 'research', research_agents, len(research_agents) > 1, None
         
         # Design/Architecture phase
-        if features.complexity in [TaskComplexity.COMPLEX, TaskComplexity.VERY_COMPLEX]:
-            design_agents = [a for a in team.primary_agents if 'architect' in a or 'design' in a]
-            if not design_agents:
-                design_agents = team.primary_agents[:1]
-            
-            stages.append(WorkflowStage(
-                stage_id=f'stage_{stage_id}',
-                name='Design & Architecture',
-                agents=design_agents,
-                parallel=False,
-                dependencies=[f'stage_{stage_id-1}'] if stage_id > 0 else [],
-                outputs=['design_spec']
-            ))
-            stage_id += 1
+        if features.complexity in (TaskComplexity.COMPLEX, TaskComplexity.VERY_COMPLEX):
+            yield 'design', list(roles['design']) or team.primary_agents[:1], False, None
         
-        # Parallel implementation
         if len(team.primary_agents) > 1:
-            stages.append(WorkflowStage(
-                stage_id=f'stage_{stage_id}',
-                name='Parallel Implementation',
-                agents=team.primary_agents,
-                parallel=True,
-                dependencies=[f'stage_{stage_id-1}'] if stage_id > 0 else [],
-                timeout=self._calculate_timeout(features.complexity),
-                outputs=['implementation_modules']
-            ))
-            stage_id += 1
-            
-            # Integration stage
-            stages.append(WorkflowStage(
-                stage_id=f'stage_{stage_id}',
-                name='Integration',
-                agents=[team.primary_agents[0]],
-                parallel=False,
-                dependencies=[f'stage_{stage_id-1}'],
-                outputs=['integrated_solution']
-            ))
-            stage_id += 1
+            # Parallel implementation, then integration by the first agent
+            yield ('parallel_implement', team.primary_agents, True,
+                   self._calculate_timeout(features.complexity))
+            yield 'integrate', [team.primary_agents[0]], False, None
         else:
             # Sequential implementation if single agent
-            stages.append(WorkflowStage(
-                stage_id=f'stage_{stage_id}',
-                name='Implementation',
-                agents=team.primary_agents,
-                parallel=False,
-                dependencies=[f'stage_{stage_id-1}'] if stage_id > 0 else [],
-                outputs=['implementation']
-            ))
-            stage_id += 1
+            yield 'implement', team.primary_agents, False, None
         
         # Testing phase
         if features.requires_testing:
-            test_agents = [a for a in team.support_agents if 'test' in a or 'qa' in a]
-            if not test_agents and team.support_agents:
-                test_agents = team.support_agents[:2]
-            
+            test_agents = list(roles['test']) or team.support_agents[:2]
             if test_agents:
-                stages.append(WorkflowStage(
-                    stage_id=f'stage_{stage_id}',
-                    name='Testing & QA',
-                    agents=test_agents,
-                    parallel=len(test_agents) > 1,
-                    dependencies=[f'stage_{stage_id-1}'],
-                    outputs=['test_results']
-                ))
-                stage_id += 1
+                yield 'test', test_agents, len(test_agents) > 1, None
         
         # Documentation phase
         if features.requires_documentation:
-            doc_agents = [a for a in team.support_agents if 'doc' in a or 'product' in a]
-            if not doc_agents:
-                doc_agents = team.primary_agents[:1]
-            
-            stages.append(WorkflowStage(
-                stage_id=f'stage_{stage_id}',
-                name='Documentation',
-                agents=doc_agents,
-                parallel=False,
-                dependencies=[f'stage_{stage_id-1}'],
-                outputs=['documentation']
-            ))
-            stage_id += 1
+            yield 'document', list(roles['doc']) or team.primary_agents[:1], False, None
         
         # Review phase
         if team.review_agents:
-            stages.append(WorkflowStage(
-                stage_id=f'stage_{stage_id}',
-                name='Final Review',
-                agents=team.review_agents,
-                parallel=len(team.review_agents) > 1,
-                dependencies=[f'stage_{stage_id-1}'],
-                outputs=['review_report']
-            ))
-            stage_id += 1
+            yield 'review', team.review_agents, len(team.review_agents) > 1, None
         
         # Deployment phase
         if features.requires_deployment:
-            deploy_agents = [a for a in team.support_agents if 'deploy' in a]
-            if not deploy_agents:
-                deploy_agents = team.primary_agents[:1]
-            
-            stages.append(WorkflowStage(
-                stage_id=f'stage_{stage_id}',
-                name='Deployment',
-                agents=deploy_agents,
-                parallel=False,
-                dependencies=[f'stage_{stage_id-1}'],
-                outputs=['deployment_status']
-            ))
-        
-        # Calculate parallelization factor
-        parallel_stages = sum(1 for s in stages if s.parallel)
-        parallelization_factor = parallel_stages / len(stages) if stages else 0.0
-        
-        return OptimizedWorkflow(
-            workflow_id=f"workflow_{hash(str(team))}"[:10],
-            workflow_type='team-orchestration',
-            stages=stages,
-            total_agents=team.total_agents,
-            estimated_time=team.estimated_time * (1 - parallelization_factor * 0.25),
-            parallelization_factor=parallelization_factor,
-            description='Enhanced team orchestration with mixed parallel/sequential execution'
+            yield 'deploy', list(roles['deploy']) or team.primary_agents[:1], False, None
+    
+    def _roles(self, team: TeamComposition) -> Mapping[str, Tuple[str, ...]]:
+        """Team agents grouped by the role their name suggests"""
+        return _team_roles(tuple(team.primary_agents), tuple(team.support_agents))
+    
+    def _workflow_id(self, team: TeamComposition) -> str:
+        """Content-addressed workflow id, stable across processes"""
+        fingerprint = _team_fingerprint(
+            tuple(team.primary_agents), tuple(team.support_agents), tuple(team.review_agents)
         )
+        return f"workflow_{fingerprint}"
     
     def _calculate_timeout(self, complexity: TaskComplexity) -> int:
         """Calculate timeout based on complexity"""
-        
-        timeouts = {
-            TaskComplexity.TRIVIAL: 60,      # 1 minute
-            TaskComplexity.SIMPLE: 300,      # 5 minutes
-            TaskComplexity.MODERATE: 600,    # 10 minutes
-            TaskComplexity.COMPLEX: 1800,    # 30 minutes
-            TaskComplexity.VERY_COMPLEX: 3600  # 1 hour
-        }
-        
-        return timeouts.get(complexity, 600)
+        return _TIMEOUT_PER_COMPLEXITY[complexity]
     
     def export_workflow(self, workflow: OptimizedWorkflow, output_path: str):
         """Export workflow to file"""
@@ -534,36 +563,35 @@ class WorkflowOptimizer:
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
         with open(output_file, 'w') as f:
-            f.write(workflow.to_json())
+            json.dump(workflow, f, cls=_WorkflowEncoder, indent=2)
         
-        self.logger.info(f"Workflow exported to {output_path}")
+        self.logger.info("Workflow exported to %s", output_path)
     
     def visualize_workflow(self, workflow: OptimizedWorkflow) -> str:
         """Generate text visualization of workflow"""
         
-        lines = []
-        lines.append(f"Workflow: {workflow.workflow_type}")
-        lines.append(f"Agents: {workflow.total_agents}")
-        lines.append(f"Estimated Time: {workflow.estimated_time:.1f}x")
-        lines.append(f"Parallelization: {workflow.parallelization_factor:.0%}")
-        lines.append("")
-        lines.append("Stages:")
+        lines = [
+            f"Workflow: {workflow.workflow_type}",
+            f"Agents: {workflow.total_agents}",
+            f"Estimated Time: {workflow.estimated_time:.1f}x",
+            f"Parallelization: {workflow.parallelization_factor:.0%}",
+            "",
+            "Stages:",
+        ]
         
+        last = len(workflow.stages) - 1
         for i, stage in enumerate(workflow.stages):
-            prefix = "  ├─" if i < len(workflow.stages) - 1 else "  └─"
-            
-            parallel_marker = " [P]" if stage.parallel else ""
-            agents_str = ", ".join(stage.agents)
-            
-            lines.append(f"{prefix} {stage.name}{parallel_marker}")
-            lines.append(f"     Agents: {agents_str}")
+            lines.append(_STAGE_TEMPLATE.format(
+                prefix="  ├─" if i < last else "  └─",
+                name=stage.name,
+                parallel_marker=" [P]" if stage.parallel else "",
+                agents=", ".join(stage.agents)
+            ))
             
             if stage.dependencies:
-                deps_str = ", ".join(stage.dependencies)
-                lines.append(f"     Dependencies: {deps_str}")
+                lines.append("     Dependencies: " + ", ".join(stage.dependencies))
             
             if stage.outputs:
-                outputs_str = ", ".join(stage.outputs)
-                lines.append(f"     Outputs: {outputs_str}")
+                lines.append("     Outputs: " + ", ".join(stage.outputs))
         
         return "\n".join(lines)
\ No newline at end of file
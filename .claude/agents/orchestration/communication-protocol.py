@@ -3,11 +3,16 @@
 Multi-Agent Communication Protocol Implementation with Color Support
 """
 
+import os
+import sys
 import json
+import atexit
 import asyncio
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from secrets import token_hex
+from typing import Dict, List, Optional, Any, TextIO
 from enum import Enum
 
 # Color codes for different agent types
@@ -34,6 +39,11 @@ class Colors:
     UNDERLINE = '\033[4m'
     RESET = '\033[0m'
 
+# Escape codes are only noise when output is piped or NO_COLOR is set
+if not sys.stdout.isatty() or 'NO_COLOR' in os.environ:
+    for _name in [name for name in vars(Colors) if name.isupper()]:
+        setattr(Colors, _name, '')
+
 # Agent color mapping
 AGENT_COLORS = {
     # Programming languages
@@ -93,6 +103,22 @@ def get_agent_color(agent_name: str) -> str:
     """Get color code for an agent based on its type"""
     return AGENT_COLORS.get(agent_name, Colors.RESET)
 
+# Indented, colored "[Agent: name]" prefixes for progress lines; agents outside
+# AGENT_COLORS are added the first time they run
+_AGENT_LABELS: Dict[str, str] = {
+    name: f"  {color}{Colors.BOLD}[Agent: {name}]{Colors.RESET}"
+    for name, color in AGENT_COLORS.items()
+}
+_COMPLETED_SUFFIX = f" {Colors.SUCCESS}✓ Completed{Colors.RESET}"
+
+def get_agent_label(agent_name: str) -> str:
+    """Get the progress-line prefix for an agent"""
+    label = _AGENT_LABELS.get(agent_name)
+    if label is None:
+        label = f"  {get_agent_color(agent_name)}{Colors.BOLD}[Agent: {agent_name}]{Colors.RESET}"
+        _AGENT_LABELS[agent_name] = label
+    return label
+
 class MessageType(Enum):
     REQUEST = "request"
     RESPONSE = "response"
@@ -115,32 +141,155 @@ class AgentMessage:
         self.correlation_id = correlation_id or self._generate_id()
         
     def _generate_id(self) -> str:
-        import uuid
-        return str(uuid.uuid4())
+        return token_hex(16)
     
-    def to_json(self) -> str:
-        return json.dumps({
+    def to_dict(self) -> Dict[str, Any]:
+        return {
             "timestamp": self.timestamp,
             "from": self.from_agent,
             "to": self.to_agent,
             "type": self.message_type.value,
             "payload": self.payload,
             "correlation_id": self.correlation_id
-        }, indent=2)
+        }
+    
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
     
     def save_to_log(self):
+        sink = _message_log(datetime.now().strftime('%Y%m%d'))
+        # One compact record per line, as JSONL requires
+        sink.write(json.dumps(self.to_dict(), separators=(',', ':')) + '\n')
+
+# Message log files by date, kept open and buffered for the life of the process
+_MESSAGE_LOGS: Dict[str, TextIO] = {}
+
+def _message_log(day: str) -> TextIO:
+    """Get the append handle for a day's message log, opening it on first use"""
+    sink = _MESSAGE_LOGS.get(day)
+    if sink is None:
+        # A new day's log means earlier ones are finished
+        close_message_logs()
         log_dir = Path(".claude/logs")
         log_dir.mkdir(exist_ok=True)
-        log_file = log_dir / f"messages_{datetime.now().strftime('%Y%m%d')}.jsonl"
-        with open(log_file, 'a') as f:
-            f.write(self.to_json() + '\n')
+        sink = open(log_dir / f"messages_{day}.jsonl", 'a', buffering=64 * 1024)
+        _MESSAGE_LOGS[day] = sink
+    return sink
+
+def flush_message_logs():
+    """Write out buffered message log records"""
+    for sink in _MESSAGE_LOGS.values():
+        sink.flush()
+
+def close_message_logs():
+    """Flush and close all open message logs"""
+    for sink in _MESSAGE_LOGS.values():
+        sink.close()
+    _MESSAGE_LOGS.clear()
+
+atexit.register(close_message_logs)
+
+@lru_cache(maxsize=32)
+def _parse_workflow_config(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a workflow file; keying on mtime drops the entry once the file changes"""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def load_workflow_config(path: str) -> Dict[str, Any]:
+    """
+    Load a workflow config, reusing the parsed copy while the file is unchanged.
+    
+    The returned dict is shared between callers and must not be modified.
+    """
+    return _parse_workflow_config(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+def _plan_stage_waves(stages: List[Dict]) -> List[List[Dict]]:
+    """
+    Order workflow stages into waves that can run concurrently (Kahn's algorithm).
+    
+    A stage listing 'dependencies' (stage ids) waits only for those stages;
+    a stage without them waits for every stage listed before it.
+    Raises ValueError for duplicate or unknown stage ids and for cycles.
+    """
+    index: Dict[str, int] = {}
+    for i, stage in enumerate(stages):
+        if stage['stage_id'] in index:
+            raise ValueError(f"duplicate stage id: {stage['stage_id']}")
+        index[stage['stage_id']] = i
+    
+    dependents: List[List[int]] = [[] for _ in stages]
+    indegree = [0] * len(stages)
+    for i, stage in enumerate(stages):
+        if 'dependencies' in stage:
+            unknown = [d for d in stage['dependencies'] if d not in index]
+            if unknown:
+                raise ValueError(f"stage {stage['stage_id']} depends on unknown stages: {', '.join(unknown)}")
+            predecessors = {index[d] for d in stage['dependencies']}
+        else:
+            predecessors = range(i)
+        for p in predecessors:
+            dependents[p].append(i)
+            indegree[i] += 1
+    
+    waves: List[List[Dict]] = []
+    ready = [i for i, degree in enumerate(indegree) if degree == 0]
+    while ready:
+        waves.append([stages[i] for i in ready])
+        unlocked = []
+        for i in ready:
+            for j in dependents[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    unlocked.append(j)
+        ready = sorted(unlocked)
+    
+    if any(indegree):
+        cycle = [stages[i]['stage_id'] for i, degree in enumerate(indegree) if degree]
+        raise ValueError(f"workflow has cycle: {', '.join(cycle)}")
+    return waves
+
+def _dependency_waves(entries: List) -> List[List[int]]:
+    """
+    Group the entries of a sequential stage into waves that can run concurrently.
+    
+    An entry that declares dependencies waits only for the earlier entries
+    producing one of them; anything else it needs comes from previous stages.
+    An entry without declared dependencies keeps strict order and waits for
+    every entry before it.
+    """
+    producers: Dict[str, int] = {}
+    levels: List[int] = []
+    for i, entry in enumerate(entries):
+        if isinstance(entry, dict) and 'dependencies' in entry:
+            level = max((levels[producers[d]] + 1 for d in entry['dependencies'] if d in producers),
+                        default=0)
+        else:
+            level = max(levels, default=-1) + 1
+        levels.append(level)
+        
+        if isinstance(entry, dict):
+            outputs = entry.get('outputs', entry.get('output', []))
+            for output in [outputs] if isinstance(outputs, str) else outputs:
+                producers[output] = i
+    
+    waves: List[List[int]] = [[] for _ in range(max(levels, default=-1) + 1)]
+    for i, level in enumerate(levels):
+        waves[level].append(i)
+    return waves
 
 class AgentOrchestrator:
     def __init__(self, config_file: str):
-        with open(config_file, 'r') as f:
-            self.config = json.load(f)
+        self.config = load_workflow_config(config_file)
+        # Fail on a malformed stage graph before anything runs
+        self._stage_waves = _plan_stage_waves(self.config['stages'])
         self.active_agents = {}
         self.message_queue = asyncio.Queue()
+        # Optional cap on how many agents run at once
+        max_concurrency = self.config.get('max_concurrency')
+        self._agent_slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        # Simulated agent work is opt-in so it never paces a real run
+        self.simulate = self.config.get('simulate', False)
+        self.simulate_delay = self.config.get('simulate_delay', 0)
         self.project_context = self._scan_project_context()
     
     def _scan_project_context(self) -> Dict[str, Any]:
@@ -209,36 +358,50 @@ class AgentOrchestrator:
         tasks = []
         for agent_config in agents:
             if isinstance(agent_config, dict):
-                task = self._run_agent(
+                task = self._run_limited(
                     agent_config['agent'],
                     agent_config.get('scope', ''),
                     agent_config.get('output', '')
                 )
             else:
-                task = self._run_agent(agent_config, '', '')
+                task = self._run_limited(agent_config, '', '')
             tasks.append(task)
         
         return await asyncio.gather(*tasks)
     
     async def _execute_sequential(self, agents: List) -> List[Dict]:
-        """Execute agents sequentially"""
-        results = []
-        for agent_config in agents:
-            if isinstance(agent_config, dict):
-                result = await self._run_agent(
-                    agent_config.get('agent', agent_config.get('name', '')),
-                    agent_config.get('scope', ''),
-                    agent_config.get('outputs', [])
-                )
-            else:
-                result = await self._run_agent(agent_config, '', '')
-            results.append(result)
+        """Execute agents in dependency order, running independent ones together"""
+        results = [None] * len(agents)
+        for wave in _dependency_waves(agents):
+            wave_results = await asyncio.gather(*(self._run_step(agents[i]) for i in wave))
+            for i, result in zip(wave, wave_results):
+                results[i] = result
         return results
     
+    def _run_step(self, agent_config: Any):
+        """Start one entry of a sequential stage"""
+        if isinstance(agent_config, dict):
+            return self._run_limited(
+                agent_config.get('agent', agent_config.get('name', '')),
+                agent_config.get('scope', ''),
+                agent_config.get('outputs', [])
+            )
+        return self._run_limited(agent_config, '', '')
+    
+    async def _run_limited(self, agent_name: str, scope: str, outputs: Any) -> Dict:
+        """Run an agent, waiting for a free slot if concurrency is capped"""
+        if self._agent_slots is None:
+            return await self._run_agent(agent_name, scope, outputs)
+        async with self._agent_slots:
+            return await self._run_agent(agent_name, scope, outputs)
+    
     async def _run_agent(self, agent_name: str, scope: str, outputs: Any) -> Dict:
         """Simulate running an agent"""
-        color = get_agent_color(agent_name)
-        print(f"  {color}{Colors.BOLD}[Agent: {agent_name}]{Colors.RESET} Starting{f' with scope: {Colors.INFO}{scope}{Colors.RESET}' if scope else ''}")
+        label = get_agent_label(agent_name)
+        if scope:
+            print(f"{label} Starting with scope: {Colors.INFO}{scope}{Colors.RESET}")
+        else:
+            print(f"{label} Starting")
         
         # Log the agent activation
         msg = AgentMessage(
@@ -250,10 +413,10 @@ class AgentOrchestrator:
         msg.save_to_log()
         
         # Simulate agent work
-        await asyncio.sleep(1)
+        if self.simulate:
+            await asyncio.sleep(self.simulate_delay)
         
-        color = get_agent_color(agent_name)
-        print(f"  {color}{Colors.BOLD}[Agent: {agent_name}]{Colors.RESET} {Colors.SUCCESS}✓ Completed{Colors.RESET}")
+        print(label + _COMPLETED_SUFFIX)
         
         return {
             "agent": agent_name,
@@ -278,9 +441,11 @@ class AgentOrchestrator:
         # Display available agents
         self.display_available_agents()
         
-        for stage in self.config['stages']:
-            result = await self.execute_stage(stage)
-            print(f"{Colors.SUCCESS}{Colors.BOLD}✓ Stage {result['stage_id']} completed{Colors.RESET}\n")
+        for wave in self._stage_waves:
+            results = await asyncio.gather(*(self.execute_stage(stage) for stage in wave))
+            flush_message_logs()
+            for result in results:
+                print(f"{Colors.SUCCESS}{Colors.BOLD}✓ Stage {result['stage_id']} completed{Colors.RESET}\n")
         
         print(f"{Colors.ORCHESTRATOR}{Colors.BOLD}{'='*60}{Colors.RESET}")
         print(f"{Colors.SUCCESS}{Colors.BOLD}✓ Workflow completed successfully!{Colors.RESET}")
@@ -288,8 +453,6 @@ class AgentOrchestrator:
 
 # Main execution
 if __name__ == "__main__":
-    import sys
-    
     # Check for workflow file argument
     if len(sys.argv) > 1:
         workflow_file = sys.argv[1]
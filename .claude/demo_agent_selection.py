@@ -7,11 +7,10 @@ import sys
 import os
 sys.path.append('.claude')
 
-from agent_selection import (
-    AgentSelector, SelectionStrategy,
-    TaskClassifier, AgentCapabilityMatrix
-)
-from agent_selection.workflow_optimizer import WorkflowOptimizer
+# Selector, matrix and optimizer modules are imported by the demos that
+# use them, so importing this script stays cheap
+from agent_selection import TaskCategory
+from demo_utils import get_selector, run_buffered
 
 
 def print_section(title):
@@ -25,7 +24,7 @@ def demo_task_classification():
     """Demo task classification"""
     print_section("TASK CLASSIFICATION DEMO")
     
-    classifier = TaskClassifier()
+    classifier = get_selector().task_classifier
     
     tasks = [
         "Build a React dashboard with real-time data visualization",
@@ -35,12 +34,11 @@ def demo_task_classification():
         "Refactor the database queries to improve performance"
     ]
     
-    for task in tasks:
+    for task, features in zip(tasks, classifier.classify_batch(tasks)):
         print(f"\nTask: {task[:60]}...")
-        features = classifier.classify_task(task)
         
         print(f"Categories: {[c.value for c in features.categories[:3]]}")
-        print(f"Complexity: {features.complexity.value}")
+        print(f"Complexity: {features.complexity.label}")
         print(f"Languages: {[l.value for l in features.languages]}")
         print(f"Frameworks: {[f.value for f in features.frameworks]}")
         print(f"Confidence: {features.confidence:.2f}")
@@ -50,7 +48,9 @@ def demo_agent_selection():
     """Demo agent selection with different strategies"""
     print_section("AGENT SELECTION DEMO")
     
-    selector = AgentSelector()
+    from agent_selection import SelectionStrategy
+    
+    selector = get_selector()
     
     task = """
     Create a comprehensive e-commerce backend with Python/FastAPI including:
@@ -89,7 +89,10 @@ def demo_workflow_optimization():
     """Demo workflow optimization"""
     print_section("WORKFLOW OPTIMIZATION DEMO")
     
-    selector = AgentSelector()
+    from agent_selection import SelectionStrategy
+    from agent_selection.workflow_optimizer import WorkflowOptimizer
+    
+    selector = get_selector()
     optimizer = WorkflowOptimizer()
     
     tasks = [
@@ -105,11 +108,8 @@ def demo_workflow_optimization():
         # Select team
         team = selector.select_agents(task_desc, strategy)
         
-        # Get task features
-        features = selector.task_classifier.classify_task(task_desc)
-        
-        # Optimize workflow
-        workflow = optimizer.optimize_workflow(team, features)
+        # Optimize workflow for the features the team was selected for
+        workflow = optimizer.optimize_workflow(team, team.features)
         
         # Visualize workflow
         print("\n" + optimizer.visualize_workflow(workflow))
@@ -119,13 +119,13 @@ def demo_agent_capabilities():
     """Demo agent capability matrix"""
     print_section("AGENT CAPABILITIES DEMO")
     
-    matrix = AgentCapabilityMatrix()
+    from agent_selection import get_default_matrix
+    
+    matrix = get_default_matrix()
     
     print(f"\nTotal agents available: {len(matrix.agents)}")
     
     # Show agents by category
-    from agent_selection.task_classifier import TaskCategory
-    
     categories_to_show = [
         TaskCategory.DEVELOPMENT,
         TaskCategory.TESTING,
@@ -144,7 +144,9 @@ def demo_intelligent_selection():
     """Demo intelligent agent selection for various scenarios"""
     print_section("INTELLIGENT SELECTION SCENARIOS")
     
-    selector = AgentSelector()
+    from agent_selection import SelectionStrategy
+    
+    selector = get_selector()
     
     scenarios = [
         {
@@ -194,12 +196,12 @@ def main():
     print(" AUTOMATED AGENT SELECTION SYSTEM DEMO")
     print("🤖"*30)
     
-    # Run demos
-    demo_task_classification()
-    demo_agent_capabilities()
-    demo_agent_selection()
-    demo_workflow_optimization()
-    demo_intelligent_selection()
+    # Run demos, each printed as a single write
+    run_buffered(demo_task_classification)
+    run_buffered(demo_agent_capabilities)
+    run_buffered(demo_agent_selection)
+    run_buffered(demo_workflow_optimization)
+    run_buffered(demo_intelligent_selection)
     
     print_section("DEMO COMPLETE")
     print("""
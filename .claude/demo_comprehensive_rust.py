@@ -7,11 +7,13 @@ import sys
 import os
 sys.path.append('.claude')
 
-from agent_selection import AgentSelector, SelectionStrategy
+from demo_utils import run_buffered
 
 def main():
     """Comprehensive Rust support demonstration"""
     
+    from agent_selection import AgentSelector, SelectionStrategy
+    
     print("🦀" * 30)
     print(" COMPREHENSIVE RUST SUPPORT DEMO")
     print("🦀" * 30)
@@ -76,9 +78,9 @@ def main():
         print(f"Expected primary: {expected}")
         print("-" * 60)
         
-        # Get agent selection
+        # Get agent selection and the features it was classified with
         team = selector.select_agents(task, strategy)
-        features = selector.task_classifier.classify_task(task)
+        features = team.features
         
         # Check results
         if expected in team.primary_agents:
@@ -103,7 +105,7 @@ def main():
         print(f"Classification:")
         print(f"  Languages: {[l.value for l in features.languages]}")
         print(f"  Categories: {[c.value for c in features.categories]}")
-        print(f"  Complexity: {features.complexity.value}")
+        print(f"  Complexity: {features.complexity.label}")
         print(f"  Confidence: {team.confidence:.1%}")
     
     print(f"\n{'='*60}")
@@ -134,4 +136,5 @@ def main():
     print(f"# prompt: 'Your Rust development task'")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    # The scenarios print dozens of lines each; write them out in one go
+    run_buffered(main)
\ No newline at end of file
@@ -7,8 +7,9 @@ import sys
 import os
 sys.path.append('.claude')
 
-from agent_selection import AgentSelector, SelectionStrategy
-from agent_selection.workflow_optimizer import WorkflowOptimizer
+# Agent selection modules are imported by the demos that use them, so
+# importing this script stays cheap
+from demo_utils import get_selector, run_buffered
 
 
 def demo_rust_tasks():
@@ -17,7 +18,10 @@ def demo_rust_tasks():
     print(" RUST ENGINEER INTEGRATION DEMO")
     print("="*60)
     
-    selector = AgentSelector()
+    from agent_selection import SelectionStrategy
+    from agent_selection.workflow_optimizer import WorkflowOptimizer
+    
+    selector = get_selector()
     optimizer = WorkflowOptimizer()
     
     # Rust-specific tasks
@@ -53,14 +57,14 @@ def demo_rust_tasks():
         print(f"Strategy: {strategy.value}")
         print("-"*60)
         
-        # Select agents
+        # Select agents and reuse the classification behind the selection
         team = selector.select_agents(task, strategy)
-        features = selector.task_classifier.classify_task(task)
+        features = team.features
         
         # Show classification
         print(f"\nTask Classification:")
         print(f"  Categories: {[c.value for c in features.categories[:3]]}")
-        print(f"  Complexity: {features.complexity.value}")
+        print(f"  Complexity: {features.complexity.label}")
         print(f"  Languages: {[l.value for l in features.languages]}")
         
         # Show selected team
@@ -94,7 +98,9 @@ def demo_rust_collaboration():
     print(" RUST COLLABORATION SCENARIOS")
     print("="*60)
     
-    selector = AgentSelector()
+    from agent_selection import SelectionStrategy
+    
+    selector = get_selector()
     
     collaboration_tasks = [
         "Build a Python extension module in Rust for data processing performance",
@@ -126,9 +132,9 @@ def check_rust_capabilities():
     print(" RUST ENGINEER CAPABILITIES")
     print("="*60)
     
-    from agent_selection.agent_capabilities import AgentCapabilityMatrix
+    from agent_selection import get_default_matrix
     
-    matrix = AgentCapabilityMatrix()
+    matrix = get_default_matrix()
     rust_engineer = matrix.get_agent('rust-engineer')
     
     if rust_engineer:
@@ -136,7 +142,7 @@ def check_rust_capabilities():
         print(f"  Description: {rust_engineer.description}")
         print(f"  Primary Categories: {[c.value for c in rust_engineer.primary_categories]}")
         print(f"  Secondary Categories: {[c.value for c in rust_engineer.secondary_categories]}")
-        print(f"  Max Complexity: {rust_engineer.max_complexity.value}")
+        print(f"  Max Complexity: {rust_engineer.max_complexity.label}")
         print(f"  MCP Servers: {rust_engineer.mcp_servers}")
         print(f"  Capabilities:")
         print(f"    - Can Test: {rust_engineer.can_test}")
@@ -156,13 +162,13 @@ def main():
     print("🦀" * 30)
     
     # Check capabilities
-    check_rust_capabilities()
+    run_buffered(check_rust_capabilities)
     
     # Demo task selection
-    demo_rust_tasks()
+    run_buffered(demo_rust_tasks)
     
     # Demo collaboration
-    demo_rust_collaboration()
+    run_buffered(demo_rust_collaboration)
     
     print("\n" + "="*60)
     print(" INTEGRATION COMPLETE")
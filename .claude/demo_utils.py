@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the agent selection demo scripts
+"""
+
+import io
+import sys
+from contextlib import redirect_stdout
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_selector():
+    """Selector shared by all demos, so they reuse its classifications and rankings"""
+    from agent_selection import AgentSelector
+    return AgentSelector()
+
+
+def run_buffered(demo):
+    """Run a demo with its output collected and written to stdout in one go"""
+    buffer = io.StringIO()
+    try:
+        with redirect_stdout(buffer):
+            demo()
+    finally:
+        sys.stdout.write(buffer.getvalue())
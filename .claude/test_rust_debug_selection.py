@@ -50,7 +50,7 @@ def test_rust_debugging_scenarios():
         print(f"Task classification:")
         print(f"  Languages: {[l.value for l in features.languages]}")
         print(f"  Categories: {[c.value for c in features.categories]}")
-        print(f"  Complexity: {features.complexity.value}")
+        print(f"  Complexity: {features.complexity.label}")
 
 def test_explicit_rust_debugging():
     """Test more explicit Rust debugging tasks"""
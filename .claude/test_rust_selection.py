@@ -44,7 +44,7 @@ def test_rust_detection():
             print(f"   ❌ Rust NOT detected")
         
         print(f"   Categories: {[cat.value for cat in features.categories]}")
-        print(f"   Complexity: {features.complexity.value}")
+        print(f"   Complexity: {features.complexity.label}")
 
 def test_rust_agent_selection():
     """Test Rust engineer selection for Rust tasks"""
@@ -132,7 +132,7 @@ def test_rust_context_files():
     else:
         print(f"❌ Rust NOT detected from file context")
     
-    print(f"Complexity: {features.complexity.value}")
+    print(f"Complexity: {features.complexity.label}")
     print(f"Categories: {[cat.value for cat in features.categories]}")
 
 def test_rust_agent_capabilities():
@@ -152,7 +152,7 @@ def test_rust_agent_capabilities():
         print(f"   Languages: {[lang.value for lang in rust_agent.languages]}")
         print(f"   Primary categories: {[cat.value for cat in rust_agent.primary_categories]}")
         print(f"   Secondary categories: {[cat.value for cat in rust_agent.secondary_categories]}")
-        print(f"   Max complexity: {rust_agent.max_complexity.value}")
+        print(f"   Max complexity: {rust_agent.max_complexity.label}")
         print(f"   Can test: {rust_agent.can_test}")
         print(f"   Can debug: {rust_agent.can_debug}")
         print(f"   Can refactor: {rust_agent.can_refactor}")
@@ -7,11 +7,14 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+import json
+import tempfile
 import unittest
+from pathlib import Path
 from agent_selection import (
     TaskClassifier, TaskCategory, TaskComplexity,
     ProgrammingLanguage, Framework, TaskFeatures,
-    AgentCapabilityMatrix, AgentCapability,
+    AgentCapabilityMatrix, AgentCapability, get_default_matrix,
     AgentSelector, SelectionStrategy, TeamComposition
 )
 from agent_selection.workflow_optimizer import WorkflowOptimizer
@@ -88,6 +91,69 @@ class TestTaskClassifier(unittest.TestCase):
         self.assertIn(TaskCategory.DEBUGGING, features.categories)
         self.assertIn(ProgrammingLanguage.TYPESCRIPT, features.languages)
         self.assertTrue(features.is_bug_fix)
+    
+    def test_complexity_ordering(self):
+        """Test that complexity levels compare by severity"""
+        self.assertLess(TaskComplexity.COMPLEX, TaskComplexity.VERY_COMPLEX)
+        self.assertLess(TaskComplexity.MODERATE, TaskComplexity.COMPLEX)
+        self.assertEqual(sorted(TaskComplexity), list(TaskComplexity))
+        
+        features = self.classifier.classify_task("Fix a typo in the README")
+        self.assertEqual(features.to_dict()['complexity'], features.complexity.label)
+        self.assertEqual(TaskComplexity.VERY_COMPLEX.label, 'very_complex')
+
+    def test_keyword_substring_matching(self):
+        """Test that keywords match as substrings, including overlapping ones"""
+        # 'unittest' contains both 'unit' and 'test'; 'docstring' contains 'docs'
+        features = self.classifier.classify_task("update unittests and docstrings")
+        self.assertIn(TaskCategory.TESTING, features.categories)
+        self.assertIn(TaskCategory.DOCUMENTATION, features.categories)
+
+        # 'postgresql' matches both the 'postgres' prefix and the longer keyword
+        features = self.classifier.classify_task("tune postgresql")
+        self.assertIn(TaskCategory.DATABASE, features.categories)
+        self.assertIn(Framework.POSTGRES, features.frameworks)
+
+    def test_history_size(self):
+        """Test that history is bounded and statistics cover only retained tasks"""
+        classifier = TaskClassifier({'history_size': 2})
+        classifier.classify_task("Deploy the application to production")
+        classifier.classify_task("Fix the bug in the login function")
+        classifier.classify_task("Write tests for the payment module")
+
+        self.assertEqual(len(classifier.task_history), 2)
+
+        stats = classifier.get_statistics()
+        self.assertEqual(stats['total_tasks'], 2)
+        self.assertNotIn('deployment', stats['category_distribution'])
+        self.assertEqual(sum(stats['complexity_distribution'].values()), 2)
+
+    def test_classify_batch(self):
+        """Test batch classification matches one-at-a-time classification"""
+        tasks = ["Fix the bug in the login function", "Build a React dashboard"]
+        batch = self.classifier.classify_batch(tasks)
+
+        self.assertEqual([f.to_dict() for f in batch],
+                         [TaskClassifier().classify_task(t).to_dict() for t in tasks])
+        self.assertEqual(len(self.classifier.task_history), 2)
+
+    def test_classification_cache(self):
+        """Test that repeated tasks reuse the cached classification"""
+        task = "Fix the bug in the component"
+        first = self.classifier.classify_task(task, {'files': ['a.py']})
+        second = self.classifier.classify_task(task, {'files': ['a.py']})
+        other = self.classifier.classify_task(task, {'files': ['a.py', 'b.ts']})
+
+        self.assertIs(first, second)
+        self.assertIn(ProgrammingLanguage.TYPESCRIPT, other.languages)
+        self.assertEqual(self.classifier.get_statistics()['total_tasks'], 3)
+    
+    def test_path_file_context(self):
+        """Test that context files may be given as Path objects"""
+        features = self.classifier.classify_task(
+            "write code", {'files': [Path('a.py'), Path('src/b.rs')]})
+        self.assertIn(ProgrammingLanguage.PYTHON, features.languages)
+        self.assertIn(ProgrammingLanguage.RUST, features.languages)
 
 
 class TestAgentCapabilityMatrix(unittest.TestCase):
@@ -166,6 +232,42 @@ class TestAgentCapabilityMatrix(unittest.TestCase):
         
         # Python-pro should have high score for Python development
         self.assertGreater(score, 0.7)
+    
+    def test_score_matrix(self):
+        """Test batch scoring matches per-task scoring"""
+        classifier = TaskClassifier()
+        features_list = [
+            classifier.classify_task("Build a React dashboard"),
+            classifier.classify_task("Optimize the PostgreSQL query"),
+            classifier.classify_task("Build a React dashboard")
+        ]
+        
+        matrix = self.matrix.score_matrix(features_list)
+        self.assertEqual(len(matrix), 3)
+        for features, row in zip(features_list, matrix):
+            self.assertEqual(row, self.matrix.score_all(features))
+        self.assertEqual(self.matrix.score_matrix([]), [])
+    
+    def test_default_matrix_is_shared(self):
+        """Test that the default matrix is built once and shared"""
+        matrix = get_default_matrix()
+        self.assertIs(matrix, get_default_matrix())
+        self.assertIs(AgentSelector().capability_matrix, matrix)
+        
+        # Collaboration updates are applied to the shared agents
+        python_agent = matrix.get_agent('python-pro')
+        self.assertIn('data-analyst', python_agent.works_well_with)
+        self.assertTrue(python_agent.compatible_with(matrix, 'data-analyst'))
+        self.assertFalse(python_agent.compatible_with(matrix, 'nextjs-developer'))
+        
+        # Reviewers work with every agent in the roster
+        reviewer = matrix.get_agent('code-reviewer')
+        self.assertTrue(reviewer.compatible_with(matrix, 'python-pro'))
+        self.assertFalse(reviewer.compatible_with(matrix, 'unknown-agent'))
+        self.assertIn('python-pro', reviewer.works_well_with)
+        self.assertNotIn('unknown-agent', reviewer.works_well_with)
+        self.assertEqual(list(reviewer.works_well_with), list(matrix.agents))
+        self.assertEqual(len(reviewer.works_well_with), len(matrix.agents))
 
 
 class TestAgentSelector(unittest.TestCase):
@@ -223,6 +325,52 @@ class TestAgentSelector(unittest.TestCase):
         self.assertIn(team.workflow_suggestion, 
                      ['parallel-collaboration', 'team-orchestration'])
     
+    def test_batch_selection(self):
+        """Test batch selection matches one-at-a-time selection"""
+        tasks = [
+            "Fix the bug in the login function",
+            "Write tests for the payment module",
+            "Fix the bug in the login function"
+        ]
+        
+        teams = self.selector.select_agents_batch(tasks, SelectionStrategy.SPECIALIZED_TEAM)
+        self.assertEqual(len(teams), 3)
+        self.assertEqual(len(self.selector.selection_history), 3)
+        
+        single = AgentSelector()
+        for task, team in zip(tasks, teams):
+            expected = single.select_agents(task, SelectionStrategy.SPECIALIZED_TEAM)
+            self.assertEqual(team.get_all_agents(), expected.get_all_agents())
+
+    def test_team_carries_features(self):
+        """Test that a selected team keeps the features it was chosen for"""
+        task = "Write tests for the payment module"
+        team = self.selector.select_agents(task, SelectionStrategy.SPECIALIZED_TEAM)
+
+        self.assertIs(team.features, self.selector.task_classifier.classify_task(task))
+        self.assertNotIn('features', repr(team))
+        
+        # Only the selected agents carry explained scores
+        self.assertEqual(set(team.agent_scores), set(team.get_all_agents()))
+        for agent_id, score in team.agent_scores.items():
+            self.assertEqual(score.agent_id, agent_id)
+            self.assertTrue(score.reasons)
+
+    def test_history_cap(self):
+        """Test that history is bounded and statistics cover only retained selections"""
+        selector = AgentSelector({'history_cap': 2})
+        selector.select_agents("Deploy the application to production")
+        selector.select_agents("Fix the bug in the login function")
+        selector.select_agents("Write tests for the payment module")
+
+        self.assertEqual(len(selector.selection_history), 2)
+
+        expected = AgentSelector()
+        expected.select_agents("Fix the bug in the login function")
+        expected.select_agents("Write tests for the payment module")
+        self.assertEqual(selector.get_selection_statistics(),
+                         expected.get_selection_statistics())
+
     def test_performance_update(self):
         """Test agent performance tracking"""
         # Update performance
@@ -236,6 +384,33 @@ class TestAgentSelector(unittest.TestCase):
         self.assertEqual(perf['total_tasks'], 3)
         self.assertEqual(perf['successful_tasks'], 2)
         self.assertAlmostEqual(perf['success_rate'], 0.667, places=2)
+    
+    def test_score_cache_invalidation(self):
+        """Test that cached scores are reused and refreshed on performance updates"""
+        features = self.selector.task_classifier.classify_task(
+            "Fix the memory leak in the Python data processing pipeline")
+        first = self.selector._rank_agents(features)
+        second = self.selector._rank_agents(features)
+        self.assertEqual([(r.agent_id, r.final_score) for r in first],
+                         [(r.agent_id, r.final_score) for r in second])
+        self.assertEqual(self.selector._score_agents_cached.cache_info().hits, 1)
+        
+        # A low success rate must be reflected immediately
+        agent_id = first[0].agent_id
+        self.selector.update_agent_performance(agent_id, success=False)
+        updated = {r.agent_id: r for r in self.selector._rank_agents(features)}
+        score = self.selector._materialize(updated[agent_id], features)
+        self.assertIn("Lower historical success rate", score.penalties)
+        self.assertLess(score.final_score, first[0].final_score)
+
+    def test_ranking_matches_scores(self):
+        """Test that the lightweight ranking agrees with the explained scores"""
+        features = self.selector.task_classifier.classify_task(
+            "Write unit tests for the user authentication module using pytest")
+        ranking = self.selector._rank_agents(features)
+        scores = [self.selector._materialize(ranked, features) for ranked in ranking]
+        self.assertEqual([(r.agent_id, r.final_score) for r in ranking],
+                         [(s.agent_id, s.final_score) for s in scores])
 
 
 class TestWorkflowOptimizer(unittest.TestCase):
@@ -308,7 +483,46 @@ class TestWorkflowOptimizer(unittest.TestCase):
                           'Implementation', 'Testing & QA', 'Review']
         has_expected = any(name in " ".join(stage_names) for name in expected_stages)
         self.assertTrue(has_expected)
-    
+
+    def test_workflow_id(self):
+        """Test workflow ids depend only on the team's ordered role lists"""
+        def make_team(primary):
+            return TeamComposition(
+                primary_agents=primary,
+                support_agents=['test-automator'],
+                review_agents=['code-reviewer'],
+                total_agents=len(primary) + 2,
+                estimated_time=2.0,
+                confidence=0.8,
+                reasoning="Multiple specialists",
+                workflow_suggestion='parallel-collaboration'
+            )
+
+        features = self.selector.task_classifier.classify_task("Build a feature")
+        first = self.optimizer.optimize_workflow(make_team(['python-pro', 'frontend-developer']), features)
+        again = self.optimizer.optimize_workflow(make_team(['python-pro', 'frontend-developer']), features)
+        other = self.optimizer.optimize_workflow(make_team(['frontend-developer', 'python-pro']), features)
+
+        self.assertEqual(first.workflow_id, again.workflow_id)
+        self.assertNotEqual(first.workflow_id, other.workflow_id)
+        self.assertRegex(first.workflow_id, r'^workflow_[0-9a-f]{10}$')
+
+    def test_workflow_export(self):
+        """Test exported workflows match their dict form"""
+        task = "Create a REST API with testing"
+        team = self.selector.select_agents(task, SelectionStrategy.SPECIALIZED_TEAM)
+        features = self.selector.task_classifier.classify_task(task)
+        workflow = self.optimizer.optimize_workflow(team, features)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'workflow.json')
+            self.optimizer.export_workflow(workflow, path)
+            with open(path) as f:
+                exported = json.load(f)
+
+        self.assertEqual(exported, workflow.to_dict())
+        self.assertEqual(json.loads(workflow.to_json()), workflow.to_dict())
+
     def test_workflow_visualization(self):
         """Test workflow visualization"""
         task = "Create a REST API with testing"